@@ -0,0 +1,213 @@
+"""
+This is the audio module, it contains the AudioManager which keeps one music track streaming across the states that
+share it and plays short sound effects, decoded once, on a fixed pool of mixer channels
+"""
+import numpy as np
+import pygame as pg
+
+# Posted by the mixer when the music stops, which is when a faded out track is replaced by the next one
+MUSIC_END = pg.event.custom_type()
+
+# The effects the game plays and their priority, an effect can take the channel of one with the same or lower priority
+EFFECTS = {
+    'impact': 1,
+    'launch': 2,
+    'enemy_destroyed': 3,
+}
+
+
+def synthesize(name, frequency):
+    """
+    Parameters
+    ----------
+    name : The name of one of the EFFECTS
+    frequency : The sample rate of the mixer
+
+    Returns
+    -------
+    The samples of the effect from -1 to 1, the game ships no sound files so every effect is generated
+    """
+    durations = {'impact': 0.12, 'launch': 0.3, 'enemy_destroyed': 0.45}
+    t = np.arange(int(durations[name] * frequency)) / frequency
+    noise = np.random.default_rng(len(name)).uniform(-1, 1, len(t))
+    if name == 'impact':
+        # A thud, low noise that dies away quickly
+        thud = np.convolve(noise, np.ones(24) / 24, mode='same') * 4
+        return np.clip(thud + 0.5 * np.sin(2 * np.pi * 90 * t), -1, 1) * np.exp(-t * 40)
+    if name == 'launch':
+        # A whoosh that drops in pitch as the projectile leaves the cannon
+        pitch = 2 * np.pi * np.cumsum(np.linspace(320, 120, len(t))) / frequency
+        return (0.6 * np.sin(pitch) + 0.3 * noise) * np.exp(-t * 9)
+    # Two falling tones over a crackle
+    pitch = 2 * np.pi * np.cumsum(np.where(t < durations[name] / 3, 660, 440)) / frequency
+    return (0.3 * np.sign(np.sin(pitch)) + 0.3 * noise) * np.exp(-t * 6)
+
+
+def make_sound(samples):
+    """
+    Parameters
+    ----------
+    samples : Samples from -1 to 1
+
+    Returns
+    -------
+    A pygame Sound of the samples in the format the mixer was opened with
+    """
+    frequency, size, channels = pg.mixer.get_init()
+    bits = abs(size)
+    if bits == 32:
+        data = samples.astype(np.float32)
+    elif size < 0:
+        data = (samples * (2 ** (bits - 1) - 1)).astype(np.int8 if bits == 8 else np.int16)
+    else:
+        data = ((samples + 1) * (2 ** (bits - 1) - 1)).astype(np.uint8 if bits == 8 else np.uint16)
+    if channels > 1:
+        data = np.repeat(data[:, np.newaxis], channels, axis=1)
+    return pg.sndarray.make_sound(np.ascontiguousarray(data))
+
+
+class AudioManager:
+    """
+    Streams one music track at a time, fading it out and the next one in only when the track changes, and plays sound
+    effects on a fixed pool of channels. An effect asked for while every channel is busy takes the channel of the
+    oldest effect with the same or lower priority, or is dropped
+    """
+
+    def __init__(self, soundtracks, channels=8, fade_ms=600):
+        """
+        Parameters
+        ----------
+        soundtracks : A dictionary of names to the paths of the music tracks
+        channels : How many effects can play at once
+        fade_ms : How long in milliseconds a track takes to fade out and the next one to fade in
+        """
+        self.soundtracks = soundtracks
+        self.fade_ms = fade_ms
+        # The track streaming, or fading out while pending waits to be played after it
+        self.current = None
+        self.pending = None
+        self.volume = 1
+        self.effects = {}
+        # Effects asked for since the last update mapped to their loudest volume, so a step full of collisions plays
+        # each effect once per frame
+        self.queued = {}
+        # Whether the mixer could be opened, the game runs silently without one
+        self.enabled = pg.mixer.get_init() is not None
+        self.channels = []
+        # The priority and start time of the effect last played on each channel
+        self.owners = []
+        if self.enabled:
+            pg.mixer.set_num_channels(channels)
+            self.channels = [pg.mixer.Channel(i) for i in range(channels)]
+            self.owners = [(0, 0)] * channels
+            pg.mixer.music.set_endevent(MUSIC_END)
+            frequency = pg.mixer.get_init()[0]
+            for name, priority in EFFECTS.items():
+                self.add_effect(name, make_sound(synthesize(name, frequency)), priority)
+
+    def add_effect(self, name, sound, priority=1):
+        """
+        Parameters
+        ----------
+        name : The name the effect is played by
+        sound : The pygame Sound of the effect, decoded into memory
+        priority : The effects it can take a channel from are those with the same or a lower priority
+        """
+        self.effects[name] = (sound, priority)
+
+    def play_music(self, name):
+        """
+        Parameters
+        ----------
+        name : The name of the track in soundtracks, or None to keep whatever is playing
+
+        A track that is already streaming carries on, any other track is played once the current one has faded out
+        """
+        if not self.enabled or name is None or name == (self.pending or self.current):
+            return
+        if self.current is None or not pg.mixer.music.get_busy():
+            self.start(name)
+            return
+        if self.pending is None:
+            pg.mixer.music.fadeout(self.fade_ms)
+        self.pending = name
+
+    def start(self, name):
+        """
+        Parameters
+        ----------
+        name : The name of the track in soundtracks to stream from its start, looping until it is replaced
+        """
+        self.current = name
+        self.pending = None
+        pg.mixer.music.load(self.soundtracks[name])
+        pg.mixer.music.play(loops=-1, fade_ms=self.fade_ms)
+
+    def handle_event(self, event):
+        """
+        Parameters
+        ----------
+        event : An event pulled by the Game, the end of a faded out track starts the one waiting for it
+        """
+        if event.type == MUSIC_END and self.pending is not None:
+            self.start(self.pending)
+
+    def set_volume(self, volume):
+        """
+        Parameters
+        ----------
+        volume : The volume from 0-1 of the music and the effects
+        """
+        self.volume = volume
+        if self.enabled:
+            pg.mixer.music.set_volume(volume)
+
+    def play_effect(self, name, volume=1):
+        """
+        Parameters
+        ----------
+        name : The name of the effect
+        volume : How loud, from 0-1, the effect is played
+
+        Queues the effect to be played at the next update, so it can be called from collision handlers in the middle of
+        a physics step
+        """
+        if name in self.effects:
+            self.queued[name] = max(volume, self.queued.get(name, 0))
+
+    def update(self):
+        """
+        Plays the effects queued since the last update, called by the Game once a frame
+        """
+        if not self.queued:
+            return
+        queued, self.queued = self.queued, {}
+        now = pg.time.get_ticks()
+        for name, volume in sorted(queued.items(), key=lambda item: -self.effects[item[0]][1]):
+            sound, priority = self.effects[name]
+            index = self.free_channel(priority)
+            if index is None:
+                continue
+            channel = self.channels[index]
+            channel.set_volume(volume * self.volume)
+            channel.play(sound)
+            self.owners[index] = (priority, now)
+
+    def free_channel(self, priority):
+        """
+        Parameters
+        ----------
+        priority : The priority of the effect about to be played
+
+        Returns
+        -------
+        The index of an idle channel, otherwise of the busy channel playing the oldest effect with the lowest priority
+        no higher than priority, or None if every channel is playing something more important
+        """
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+        index = min(range(len(self.channels)), key=self.owners.__getitem__, default=None)
+        if index is None or self.owners[index][0] > priority:
+            return None
+        return index
@@ -0,0 +1,305 @@
+"""
+This is the benchmark module, it times physics stepping, sprite drawing, menu frames and level restarts under SDL's
+dummy drivers, writes the results as JSON and fails when any of them got slower than a stored baseline, is missing from
+the results or could not run
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+# The dummy drivers have to be chosen before pygame opens a window or the mixer
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame as pg
+import pymunk as pm
+from pymunk import Vec2d
+
+# The reference results compared against by default, measured on the machine described in its "machine" entry
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+STRESS_COUNTS = (100, 500, 1000)
+QUICK_STRESS_COUNTS = (100, 500)
+# The metrics a quick run leaves out, so they are not missed when it is compared with a full baseline
+FULL_ONLY = {f'physics.stress_{count}.step_ms' for count in STRESS_COUNTS if count not in QUICK_STRESS_COUNTS}
+
+
+def measure(function, number=100, repeat=5):
+    """
+    Parameters
+    ----------
+    function : The function to time, called with no arguments
+    number : How many calls make up one run
+    repeat : How many runs are timed
+
+    Returns
+    -------
+    The median time of one call in milliseconds, the median keeps one slow run from skewing the result
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        runs.append((time.perf_counter() - start) / number)
+    return statistics.median(runs) * 1000
+
+
+def physics_benchmarks(metrics, quick):
+    """
+    Parameters
+    ----------
+    metrics : The dictionary the results are added to
+    quick : Whether to run a shorter version
+
+    Times one space.step on every shipped level and on generated stress scenes
+    """
+    from level_data import level_library
+    from physics import stress_scene
+    from simulation import build_level
+
+    for level_pointer in range(1, len(level_library) + 1):
+        level = build_level(level_pointer, 1)
+        metrics[f'physics.level_{level_pointer}.step_ms'] = measure(lambda: level.step(1 / 165), 200, 5)
+    for count in QUICK_STRESS_COUNTS if quick else STRESS_COUNTS:
+        space = stress_scene(count)
+        for _ in range(165):
+            space.step(1 / 165)
+        metrics[f'physics.stress_{count}.step_ms'] = measure(lambda: space.step(1 / 165), 20, 5)
+
+
+def sprite_benchmarks(metrics, game):
+    """
+    Parameters
+    ----------
+    metrics : The dictionary the results are added to
+    game : The Game whose display and images the sprites use
+
+    Times one draw of every kind of sprite in the sprites module
+    """
+    from sprites import Button, Label, Floor, Block, CannonBall, PowerSlider, AngleGraphic, Enemy, VolumeSlider, \
+        ShotIndicator, TrajectoryPreview
+    from render import PolygonBatch
+
+    space = pm.Space()
+    space.gravity = (0, 981)
+    block = Block(game, Vec2d(640, 400), (100, 40), 'dynamic', 0.3, space)
+    ball = CannonBall(game.display, Vec2d(140, 510), 10, space, 2, 0.5, 0.5)
+    preview = TrajectoryPreview(game.display, space)
+    preview.compute(ball, 500, 30)
+    draws = {
+        'Button': Button(game, (540, 410), (200, 100), 'play', 40).draw,
+        'Label': Label(game, (540, 100), (200, 100), 'PMPG', 50).draw,
+        'Floor': Floor(game.display, (0, 720), (1280, 720), space).draw,
+        'Block': block.draw,
+        'CannonBall': ball.draw,
+        'PowerSlider': lambda slider=PowerSlider(game.display, (60, 100), (200, 50)): slider.draw(500),
+        'AngleGraphic': lambda slider=AngleGraphic(game.display, (60, 200), (200, 50)): slider.draw(45),
+        'Enemy': Enemy(game.display, Vec2d(780, 686), (25, 25), space).draw,
+        'VolumeSlider': lambda slider=VolumeSlider(game.display, (390, 300), (500, 50)): slider.draw(0.5),
+        'ShotIndicator': lambda indicator=ShotIndicator(game.display, (140, 510)): indicator.draw(30),
+        'TrajectoryPreview': preview.draw,
+    }
+    for name, draw in draws.items():
+        metrics[f'draw.{name}_ms'] = measure(draw, 500, 5)
+    # Working the path out again is the expensive part, so it is timed separately from drawing it
+    metrics['draw.TrajectoryPreview_compute_ms'] = measure(
+        lambda: (setattr(preview, 'key', None), preview.compute(ball, 500, 30)), 50, 5)
+    # Moving the corners of many bodies into place is what the PolygonBatch is for
+    blocks = [Block(game, Vec2d(20 + i % 60 * 21, 100 + i // 60 * 21), (20, 20), 'dynamic', 0.3, space)
+              for i in range(500)]
+    batch = PolygonBatch()
+    batch.add(*blocks)
+    metrics['draw.PolygonBatch_500_transform_ms'] = measure(
+        lambda: batch.components(batch.transform(0.5), blocks), 50, 5)
+
+
+def menu_benchmarks(metrics, game):
+    """
+    Parameters
+    ----------
+    metrics : The dictionary the results are added to
+    game : The Game whose states are timed
+
+    Times a full frame and an idle frame of every menu in Game.states
+    """
+    from menu import Menu, PostGameMenu
+
+    for key, state in game.states.items():
+        if not isinstance(state, Menu):
+            continue
+        if isinstance(state, PostGameMenu):
+            game.level_pointer = 1
+            state.create_buttons(1)
+        name = f'{type(state).__name__}_{key}'
+
+        def full_frame():
+            state.renderer.refresh()
+            state.renderer.render(state.components())
+
+        metrics[f'menu.{name}.full_frame_ms'] = measure(full_frame, 50, 5)
+        metrics[f'menu.{name}.idle_frame_ms'] = measure(lambda: state.renderer.render(state.components()), 200, 5)
+
+
+def level_benchmarks(metrics, skipped, game):
+    """
+    Parameters
+    ----------
+    metrics : The dictionary the results are added to
+    skipped : The dictionary benchmarks that could not run are added to, with the reason
+    game : The Game whose level is timed
+
+    Times Level.restart() and a full frame of every shipped level, and switching between them
+    """
+    from level_data import level_library
+
+    level = game.states[5]
+    game.class_choice = 1
+    for level_pointer in range(1, len(level_library) + 1):
+        game.level_pointer = level_pointer
+        try:
+            metrics[f'level.level_{level_pointer}.restart_ms'] = measure(level.restart, 10, 5)
+        except (FileNotFoundError, pg.error) as error:
+            # A level whose assets are missing is reported instead of failing the whole run
+            skipped[f'level.level_{level_pointer}'] = str(error)
+            continue
+
+        def full_frame():
+            level.build_static_layer()
+            level.renderer.set_background(level.static_layer)
+            level.renderer.refresh()
+            level.renderer.render(level.components(1))
+
+        metrics[f'level.level_{level_pointer}.full_frame_ms'] = measure(full_frame, 20, 5)
+        metrics[f'level.level_{level_pointer}.frame_ms'] = measure(
+            lambda: (level.save_states(), level.step(1 / 165), level.renderer.render(level.components(1))), 100, 5)
+
+    if len(level_library) > 1 and not skipped:
+        def switch_level():
+            # Loading another level builds it from the pooled sprites of the last one
+            game.level_pointer = game.level_pointer % len(level_library) + 1
+            level.restart()
+
+        metrics['level.switch_ms'] = measure(switch_level, 20, 5)
+
+
+def run(quick=False):
+    """
+    Parameters
+    ----------
+    quick : Whether to run a shorter version, for a fast check
+
+    Returns
+    -------
+    The results as a dictionary of the machine they ran on, whether the run was quick, the metrics in milliseconds
+    and anything skipped
+
+    The game saves and records into a temporary folder, so the player's save is neither read nor overwritten
+    """
+    pg.init()
+    from main import Game
+
+    metrics = {}
+    skipped = {}
+    with tempfile.TemporaryDirectory() as directory:
+        game = Game(os.path.join(directory, 'save.pms'), os.path.join(directory, 'recordings'))
+        physics_benchmarks(metrics, quick)
+        sprite_benchmarks(metrics, game)
+        menu_benchmarks(metrics, game)
+        level_benchmarks(metrics, skipped, game)
+        # Anything still being written has to land before the folder is removed
+        game.saves.close()
+    pg.quit()
+    return {
+        'machine': {
+            'python': platform.python_version(),
+            'pygame': pg.version.ver,
+            'pymunk': pm.version,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'quick': quick,
+        'metrics': metrics,
+        'skipped': skipped,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Parameters
+    ----------
+    results : The results of this run
+    baseline : The stored results to compare against
+    threshold : How much slower, as a fraction, a metric may get before it counts as a regression
+
+    Returns
+    -------
+    The lines of a comparison table and the list of metrics that regressed or are in the baseline but not the results
+    """
+    lines = []
+    regressions = []
+    for name in sorted(baseline['metrics']):
+        if name not in results['metrics'] and not (results.get('quick') and name in FULL_ONLY):
+            lines.append(f'{name:<55} {"":>10}      MISSING')
+            regressions.append(name)
+    for name, value in sorted(results['metrics'].items()):
+        old = baseline['metrics'].get(name)
+        if old is None or old <= 0:
+            lines.append(f'{name:<55} {value:>10.4f} ms   (new)')
+            continue
+        change = value / old - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        lines.append(f'{name:<55} {value:>10.4f} ms {change:>+8.1%}{flag}')
+    return lines, regressions
+
+
+def main(argv=None):
+    """
+    Parameters
+    ----------
+    argv : The command line arguments, sys.argv if not given
+
+    Returns
+    -------
+    The exit status, 1 if any benchmark was skipped or any metric regressed past the threshold or is missing
+    """
+    parser = argparse.ArgumentParser(description='Benchmarks physics, drawing, menu frames and level restarts')
+    parser.add_argument('--output', default='benchmark_results.json', help='where the results are written')
+    parser.add_argument('--baseline', default=BASELINE_PATH,
+                        help='results of an earlier run to compare against (default benchmark_baseline.json)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the results to the baseline instead of comparing against it')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='fraction a metric may slow down by before the check fails (default 0.25)')
+    parser.add_argument('--quick', action='store_true', help='run a shorter version')
+    args = parser.parse_args(argv)
+
+    results = run(args.quick)
+    with open(args.baseline if args.update_baseline else args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    for name, reason in results['skipped'].items():
+        print(f'skipped {name}: {reason}')
+    if args.update_baseline or not os.path.exists(args.baseline):
+        for name, value in sorted(results['metrics'].items()):
+            print(f'{name:<55} {value:>10.4f} ms')
+        return 1 if results['skipped'] else 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    lines, regressions = compare(results, baseline, args.threshold)
+    print('\n'.join(lines))
+    if regressions:
+        print(f'{len(regressions)} metric(s) slowed down by more than {args.threshold:.0%} or are missing')
+    if results['skipped']:
+        print(f'{len(results["skipped"])} benchmark(s) could not run')
+    return 1 if regressions or results['skipped'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
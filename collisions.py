@@ -0,0 +1,123 @@
+"""
+This is the collisions module, it contains the CollisionRegistry which finds the sprite behind each colliding shape
+and removes destroyed sprites from the space in one batch after each step
+"""
+
+
+class CollisionRegistry:
+    """
+    Keeps an index of shapes to the sprites that own them, dispatches collisions between pairs of collision types to
+    handlers that are given those sprites and defers every removal until the space has finished stepping
+    """
+
+    def __init__(self, space):
+        """
+        Parameters
+        ----------
+        space : The space whose collisions are handled
+        """
+        self.space = space
+        self.entities = {}
+        # Sprites waiting to be removed after the step, mapped to the sprite groups they are removed from
+        self.pending = {}
+
+    def register(self, *entities):
+        """
+        Parameters
+        ----------
+        entities : Sprites with a body_shape, which collision handlers are given instead of the shape
+        """
+        for entity in entities:
+            self.entities[entity.body_shape] = entity
+
+    def unregister(self, entity):
+        """
+        Parameters
+        ----------
+        entity : A sprite that no longer takes part in collisions
+        """
+        self.entities.pop(entity.body_shape, None)
+
+    def entity(self, shape):
+        """
+        Parameters
+        ----------
+        shape : A pymunk shape
+
+        Returns
+        -------
+        The sprite that owns the shape, or None if it was never registered
+        """
+        return self.entities.get(shape)
+
+    def on(self, type_a, type_b, begin=None, pre_solve=None, post_solve=None, separate=None):
+        """
+        Parameters
+        ----------
+        type_a : The collision type of the first shape
+        type_b : The collision type of the second shape
+        begin : Called when the shapes first touch, returning False ignores the collision
+        pre_solve : Called every step they touch before the collision is solved, returning False ignores it this step
+        post_solve : Called every step they touch after the collision is solved
+        separate : Called when the shapes stop touching
+
+        Every handler is called with the sprite of type_a, the sprite of type_b and the pymunk arbiter
+        """
+        handler = self.space.add_collision_handler(type_a, type_b)
+        if begin is not None:
+            handler.begin = self.dispatch(begin, True)
+        if pre_solve is not None:
+            handler.pre_solve = self.dispatch(pre_solve, True)
+        if post_solve is not None:
+            handler.post_solve = self.dispatch(post_solve, False)
+        if separate is not None:
+            handler.separate = self.dispatch(separate, False)
+
+    def dispatch(self, callback, returns_bool):
+        """
+        Parameters
+        ----------
+        callback : The handler registered for a pair of collision types
+        returns_bool : Whether pymunk expects a bool back, in which case a callback returning None counts as True
+
+        Returns
+        -------
+        The function pymunk calls, which looks up both sprites in the index and passes them to callback
+        """
+        entities = self.entities
+
+        def handle(arbiter, space, data):
+            shape_a, shape_b = arbiter.shapes
+            result = callback(entities.get(shape_a), entities.get(shape_b), arbiter)
+            if returns_bool:
+                return result is not False
+
+        return handle
+
+    def remove_later(self, entity, *groups):
+        """
+        Parameters
+        ----------
+        entity : A sprite to take out of the space once the current step has finished
+        groups : The sprite groups it is removed from at the same time
+
+        Removing bodies from inside a collision callback is not allowed, so removals are batched after the step
+        """
+        self.pending.setdefault(entity, set()).update(groups)
+        self.space.add_post_step_callback(self.flush, self)
+
+    def flush(self, space=None, key=None):
+        """
+        Removes every pending sprite's body and shape from the space in one call, then from its sprite groups
+        """
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        removed = []
+        for entity in pending:
+            removed.extend((entity.body, entity.body_shape))
+            self.unregister(entity)
+        self.space.remove(*removed)
+        for entity, groups in pending.items():
+            for group in groups:
+                group.remove(entity)
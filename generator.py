@@ -0,0 +1,498 @@
+"""
+This is the generator module, it builds random level layouts from a seed, keeps those that stand still until the first
+shot and can be won with every load-out, and scores their difficulty by how many of a fixed sample of aims win
+"""
+import argparse
+import functools
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from level_data import LOCAL_INDEX, compile_level, compile_loadouts
+from resources import asset_path
+from simulation import SETTLE_SPEED, build_level
+
+# Where the floor's surface is, the floor is a segment at y=720 with a radius of 9
+FLOOR_TOP = 711
+# The region to the right of the cannon that structures are built in
+MIN_X = 380
+MAX_X = 1240
+ENEMY_SIZE = 25
+# The block the cannon stands on and the wall behind it, the same in every level
+LAUNCH_SITE = [
+    {"pos": [85, 620], "size": [170, 200], "body": "static"},
+    {"pos": [110, 260], "size": [10, 520], "body": "static"}
+]
+POWERS = (300, 450, 600, 750, 900, 1000)
+ANGLES = (0, 10, 20, 35, 50)
+# How many aims every load-out is scored on, the same for every level so their difficulties can be compared
+SAMPLE_SIZE = 15
+GENERATED_DIR = asset_path('levels', 'generated')
+
+
+@functools.lru_cache(maxsize=None)
+def default_loadouts():
+    """
+    Returns
+    -------
+    The compiled load-outs listed in the index, which generated levels use. The index is read once by each process
+    """
+    with open(asset_path('levels', 'index.json')) as file:
+        return compile_loadouts(json.load(file).get('loadouts'), 'index.json')
+
+
+def block(x, y, width, height, body, angle=0):
+    """
+    Parameters
+    ----------
+    x : The x coordinate of the centre
+    y : The y coordinate of the centre
+    width : The width of the block
+    height : The height of the block
+    body : "static" or "dynamic"
+    angle : The angle of the block in radians
+
+    Returns
+    -------
+    The block in the level file format
+    """
+    data = {"pos": [x, y], "size": [width, height], "body": body}
+    if angle:
+        data["angle"] = angle
+    return data
+
+
+def enemy_on(x, top):
+    """
+    Parameters
+    ----------
+    x : The x coordinate of the centre of the enemy
+    top : The y coordinate of the surface it stands on
+
+    Returns
+    -------
+    An enemy in the level file format, resting on the surface
+    """
+    return {"pos": [x, top - ENEMY_SIZE / 2], "size": [ENEMY_SIZE, ENEMY_SIZE]}
+
+
+def tower(rng, left, right):
+    """
+    Parameters
+    ----------
+    rng : The random number generator of the layout
+    left : The left edge of the space the structure is built in
+    right : The right edge of the space the structure is built in
+
+    Returns
+    -------
+    The blocks and enemies of a static pedestal with either a dynamic column or two dynamic pillars and a plank on it,
+    and an enemy on top
+    """
+    width = rng.randrange(60, min(180, right - left) + 1, 10)
+    x = rng.randrange(left + width // 2, right - width // 2 + 1, 5)
+    base = rng.randrange(20, 201, 10)
+    top = FLOOR_TOP - base
+    blocks = [block(x, FLOOR_TOP - base / 2, width, base, 'static')]
+    if rng.random() < 0.5:
+        column_width, column_height = rng.randrange(20, 45, 5), rng.randrange(60, 301, 20)
+        blocks.append(block(x, top - column_height / 2, column_width, column_height, 'dynamic'))
+        return blocks, [enemy_on(x, top - column_height)]
+    pillar_width, pillar_height = rng.randrange(15, 31, 5), rng.randrange(50, 161, 10)
+    for side in (-1, 1):
+        blocks.append(block(x + side * (width - pillar_width) / 2, top - pillar_height / 2, pillar_width,
+                            pillar_height, 'dynamic'))
+    plank = rng.randrange(15, 26, 5)
+    blocks.append(block(x, top - pillar_height - plank / 2, width, plank, 'dynamic'))
+    return blocks, [enemy_on(x, top - pillar_height - plank)]
+
+
+def platform(rng, left, right):
+    """
+    Parameters
+    ----------
+    rng : The random number generator of the layout
+    left : The left edge of the space the structure is built in
+    right : The right edge of the space the structure is built in
+
+    Returns
+    -------
+    The blocks and enemies of a high static platform on a post with an enemy on it, sometimes behind a dynamic shield
+    """
+    width = rng.randrange(80, min(200, right - left) + 1, 10)
+    x = rng.randrange(left + width // 2, right - width // 2 + 1, 5)
+    height = rng.randrange(150, 401, 25)
+    thickness = rng.randrange(20, 41, 10)
+    top = FLOOR_TOP - height - thickness
+    blocks = [block(x, FLOOR_TOP - height / 2, 30, height, 'static'),
+              block(x, top + thickness / 2, width, thickness, 'static')]
+    enemy_x = x + rng.randrange(-(width - 2 * ENEMY_SIZE) // 2, (width - 2 * ENEMY_SIZE) // 2 + 1, 5)
+    if rng.random() < 0.5:
+        shield_height = rng.randrange(40, 81, 10)
+        blocks.append(block(x - width / 2 + 10, top - shield_height / 2, 15, shield_height, 'dynamic'))
+    return blocks, [enemy_on(enemy_x, top)]
+
+
+def bunker(rng, left, right):
+    """
+    Parameters
+    ----------
+    rng : The random number generator of the layout
+    left : The left edge of the space the structure is built in
+    right : The right edge of the space the structure is built in
+
+    Returns
+    -------
+    The blocks and enemies of an enemy on the floor behind a dynamic wall, sometimes under a static slope
+    """
+    x = rng.randrange(left + 60, right - 30 + 1, 5)
+    wall_height = rng.randrange(40, 121, 10)
+    blocks = [block(x - 50, FLOOR_TOP - wall_height / 2, 20, wall_height, 'dynamic')]
+    if rng.random() < 0.4 and x - 140 > left:
+        blocks.append(block(x - 120, FLOOR_TOP - 15, 80, 25, 'static', round(rng.uniform(-0.6, -0.2), 2)))
+    return blocks, [enemy_on(x, FLOOR_TOP)]
+
+
+STRUCTURES = (tower, platform, bunker)
+
+
+def generate_layout(seed, max_structures=3):
+    """
+    Parameters
+    ----------
+    seed : The seed of the layout, the same seed always gives the same layout
+    max_structures : The most structures built side by side
+
+    Returns
+    -------
+    A level in the level file format, with the launch site of the shipped levels and one to max_structures structures
+    """
+    rng = random.Random(seed)
+    count = rng.randint(1, max_structures)
+    # The region is split into one slot per structure so they never overlap, each at least 200 pixels wide
+    slot = (MAX_X - MIN_X) / count
+    edges = [MIN_X] + [round(MIN_X + i * slot + rng.uniform(-40, 40)) for i in range(1, count)] + [MAX_X]
+    blocks = [dict(site) for site in LAUNCH_SITE]
+    enemies = []
+    for left, right in zip(edges, edges[1:]):
+        structure_blocks, structure_enemies = rng.choice(STRUCTURES)(rng, left, right)
+        blocks.extend(structure_blocks)
+        enemies.extend(structure_enemies)
+    return {
+        "background": "game_background_1",
+        "floor": {"start": [0, 720], "end": [1280, 720]},
+        "blocks": blocks,
+        "enemies": enemies,
+        "next": None
+    }
+
+
+def is_stable(level, duration=2, tolerance=1, dt=1 / 165):
+    """
+    Parameters
+    ----------
+    level : A loaded headless Level
+    duration : How many seconds it is left to stand before the first shot
+    tolerance : How many pixels a dynamic block or enemy may move before the layout counts as collapsing
+    dt : The length in seconds of each physics step
+
+    Returns
+    -------
+    True if no dynamic block or enemy moved further than tolerance or turned more than a few degrees
+    """
+    bodies = [sprite.body for sprite in (*level.dynamic_blocks(), *level.enemies)]
+    start = [(body.position, body.angle) for body in bodies]
+    for _ in range(int(duration / dt)):
+        level.step(dt)
+    return all(body.position.get_distance(position) <= tolerance and abs(body.angle - angle) <= math.radians(3)
+               for body, (position, angle) in zip(bodies, start))
+
+
+def aim_result(level, aim, max_time=15):
+    """
+    Parameters
+    ----------
+    level : A headless Level that has been restarted once, so every restart restores its snapshot
+    aim : The (shot_power, shot_angle) pair tried
+    max_time : The simulated time in seconds after which a shot is given up
+
+    Returns
+    -------
+    The indices of the enemies destroyed by firing every weapon with the aim, the later weapons finding what the
+    earlier ones knocked down
+    """
+    level.restart()
+    level.simulate([aim] * len(level.weapons), max_time=max_time, settle_speed=SETTLE_SPEED)
+    return frozenset(i for i, enemy in enumerate(level.snapshot.enemies) if enemy not in level.enemies)
+
+
+def solve_loadout(level, aims, sample_size=SAMPLE_SIZE):
+    """
+    Parameters
+    ----------
+    level : A headless Level that has been restarted once, so every restart restores its snapshot
+    aims : The (shot_power, shot_angle) pairs that may be tried, in the order they are tried
+    sample_size : How many of the first aims are all tried and scored, whether or not a winning sequence is found
+
+    Returns
+    -------
+    The fraction of the sampled aims that won the level with every weapon fired with them, and a winning sequence of
+    aims or None if every aim was tried without finding one. The aims after the sample are only tried while there is
+    no winning sequence and do not count towards the fraction
+    """
+    sample = aims[:sample_size]
+    results = {aim: aim_result(level, aim) for aim in sample}
+    enemies = len(level.snapshot.enemies)
+    win_fraction = sum(len(destroyed) == enemies for destroyed in results.values()) / len(sample)
+    tried = set()
+    solution = winning_sequence(level, results, tried)
+    for aim in aims[sample_size:]:
+        if solution is not None:
+            break
+        results[aim] = aim_result(level, aim)
+        # Only an aim that destroyed something can make a new winning sequence
+        if results[aim]:
+            solution = winning_sequence(level, results, tried)
+    return win_fraction, solution
+
+
+def winning_sequence(level, results, tried, max_time=30, attempts=4):
+    """
+    Parameters
+    ----------
+    level : A headless Level that has been restarted once, so every restart restores its snapshot
+    results : A dictionary of aims and the enemies each destroyed, as returned by aim_result
+    tried : The sequences already simulated, which are skipped and added to
+    max_time : The simulated time in seconds after which an attempt is given up
+    attempts : How many sequences are simulated at most
+
+    Returns
+    -------
+    A sequence of aims, one for each weapon at most, that won the level when fired in order, or None if none was found.
+    Aims that won on their own are tried first, used for every weapon, then sequences that start from the aims that
+    destroyed the most enemies and follow them with the aims that destroy the most enemies still left
+    """
+    enemies = frozenset(range(len(level.snapshot.enemies)))
+    candidates = [(aim,) * len(level.weapons) for aim, destroyed in results.items() if destroyed == enemies]
+    for first in sorted((aim for aim in results if results[aim]), key=lambda aim: -len(results[aim])):
+        shots, left = [first], enemies - results[first]
+        while left and len(shots) < len(level.weapons):
+            aim = max(results, key=lambda aim: len(results[aim] & left))
+            if not results[aim] & left:
+                break
+            shots.append(aim)
+            left -= results[aim]
+        if not left:
+            candidates.append(tuple(shots))
+    for shots in [shots for shots in dict.fromkeys(candidates) if shots not in tried][:attempts]:
+        tried.add(shots)
+        level.restart()
+        # Shots are cut short once they settle while the aims are scored, so every sequence is played again with each
+        # weapon left to time out as it is in the game
+        if level.simulate(shots, max_time=max_time) == 1:
+            return list(shots)
+    return None
+
+
+class GeneratedLevel:
+    """
+    A layout that passed validation, with how often an aim wins it with each load-out and a sequence of shots that wins
+    it with each
+    """
+
+    def __init__(self, seed, data, win_fractions, solutions):
+        """
+        Parameters
+        ----------
+        seed : The seed the layout was generated from
+        data : The level in the level file format
+        win_fractions : A dictionary of each load-out number and the fraction of the sampled aims that win the level
+            when every weapon is fired with them
+        solutions : A dictionary of each load-out number and a sequence of aims that won with it
+        """
+        self.seed = seed
+        self.data = data
+        self.win_fractions = win_fractions
+        self.solutions = solutions
+
+    @property
+    def difficulty(self):
+        """
+        Returns
+        -------
+        From 0 for a level every sampled aim wins to 1 for one none of them win, averaged over the load-outs
+        """
+        return 1 - sum(self.win_fractions.values()) / len(self.win_fractions)
+
+    def save(self, directory=GENERATED_DIR):
+        """
+        Parameters
+        ----------
+        directory : The folder the level file is written to
+
+        Returns
+        -------
+        The path of the level file, which add_to_index lists in the game
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'generated_{self.seed}.json')
+        solutions = {str(class_choice): [list(aim) for aim in shots] for class_choice, shots in self.solutions.items()}
+        data = dict(self.data, seed=self.seed, difficulty=round(self.difficulty, 3), solutions=solutions)
+        with open(path, 'w') as file:
+            json.dump(data, file, indent=4)
+        return path
+
+    def __repr__(self):
+        fractions = ', '.join(f'class {class_choice} {fraction:.0%}'
+                              for class_choice, fraction in self.win_fractions.items())
+        return (f'GeneratedLevel(seed={self.seed}, difficulty={self.difficulty:.2f}, {fractions}, '
+                f'enemies={len(self.data["enemies"])}, blocks={len(self.data["blocks"])})')
+
+
+def validate(task):
+    """
+    Parameters
+    ----------
+    task : A tuple of (seed, aims, sample_size)
+
+    Returns
+    -------
+    The seed and the GeneratedLevel, or None if the layout collapsed or a load-out could not win it
+
+    Runs in the worker processes so it has to be a module level function. Each worker generates its own layout from
+    the seed so only the seed and the result cross between processes
+    """
+    seed, aims, sample_size = task
+    data = generate_layout(seed)
+    compiled = compile_level(data, f'seed {seed}', default_loadouts())
+    win_fractions = {}
+    solutions = {}
+    for class_choice in sorted(compiled['loadouts']):
+        level = build_level(0, class_choice, compiled)
+        if not solutions and not is_stable(level):
+            return seed, None
+        # Takes the snapshot every shot is restored from
+        level.restart()
+        win_fractions[class_choice], solutions[class_choice] = solve_loadout(level, aims, sample_size)
+        if solutions[class_choice] is None:
+            return seed, None
+    return seed, GeneratedLevel(seed, data, win_fractions, solutions)
+
+
+class LevelGenerator:
+    """
+    Generates and validates layouts from consecutive seeds across a pool of processes
+    """
+
+    def __init__(self, processes=None, aims=None, sample_size=SAMPLE_SIZE):
+        """
+        Parameters
+        ----------
+        processes : How many processes validate layouts, every core if not given
+        aims : The (shot_power, shot_angle) pairs every layout may be tried with, in the order they are tried. A grid of
+            POWERS and ANGLES shuffled with a fixed seed if not given, so the first aims tried are spread across it
+        sample_size : How many of the first aims every load-out is scored on, see solve_loadout
+        """
+        self.processes = processes or os.cpu_count() or 1
+        if aims is None:
+            aims = [(power, angle) for power in POWERS for angle in ANGLES]
+            random.Random(0).shuffle(aims)
+        self.aims = aims
+        self.sample_size = sample_size
+        self.pool = None
+        self.candidates = 0
+
+    def __enter__(self):
+        if self.processes > 1:
+            self.pool = multiprocessing.Pool(self.processes)
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def generate(self, count, seed=0, max_candidates=None):
+        """
+        Parameters
+        ----------
+        count : How many valid levels to generate
+        seed : The first seed tried
+        max_candidates : How many seeds are tried at most, 50 for every level asked for if not given
+
+        Returns
+        -------
+        The valid GeneratedLevels in order of seed. Seeds are validated in batches and only the lowest valid seeds are
+        kept, so the same arguments give the same levels however many processes there are
+        """
+        max_candidates = max_candidates or count * 50
+        levels = []
+        batch_size = self.processes * 8
+        while len(levels) < count and self.candidates < max_candidates:
+            seeds = range(seed + self.candidates, seed + min(self.candidates + batch_size, max_candidates))
+            self.candidates += len(seeds)
+            tasks = [(candidate, self.aims, self.sample_size) for candidate in seeds]
+            if self.pool is None:
+                results = map(validate, tasks)
+            else:
+                results = self.pool.imap_unordered(validate, tasks)
+            levels.extend(sorted((level for _, level in results if level is not None), key=lambda level: level.seed))
+        return levels[:count]
+
+
+def add_to_index(paths):
+    """
+    Parameters
+    ----------
+    paths : The level files to list after the levels already in the local index, which the game lists after those of
+        assets/levels/index.json. The shipped index is left as it is
+    """
+    directory = asset_path('levels')
+    index_path = os.path.join(directory, LOCAL_INDEX)
+    index = {'levels': []}
+    if os.path.exists(index_path):
+        with open(index_path) as file:
+            index = json.load(file)
+    index['levels'].extend(os.path.relpath(path, directory).replace(os.sep, '/') for path in paths)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    with open(index_path, 'w') as file:
+        json.dump(index, file, indent=4)
+
+
+def main(argv=None):
+    """
+    Parameters
+    ----------
+    argv : The command line arguments, sys.argv if not given
+
+    Returns
+    -------
+    The exit status, 1 if fewer levels than asked for were found
+    """
+    parser = argparse.ArgumentParser(description='Generates levels that can be won with every load-out')
+    parser.add_argument('count', type=int, nargs='?', default=10, help='how many levels to generate')
+    parser.add_argument('--seed', type=int, default=0, help='the first seed tried')
+    parser.add_argument('--processes', type=int, help='how many processes validate levels, every core if not given')
+    parser.add_argument('--out', default=GENERATED_DIR, help='the folder the level files are written to')
+    parser.add_argument('--add-to-index', action='store_true', help='list the levels in the game, in assets/levels/generated/index.json')
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    with LevelGenerator(args.processes) as generator:
+        levels = generator.generate(args.count, args.seed)
+    elapsed = time.perf_counter() - start
+    paths = [level.save(args.out) for level in levels]
+    for level in sorted(levels, key=lambda level: level.difficulty):
+        print(level)
+    print(f'{len(levels)} levels from {generator.candidates} layouts in {elapsed:.1f} s, '
+          f'{len(levels) / elapsed * 60:.0f} a minute on {generator.processes} process(es)')
+    if args.add_to_index:
+        add_to_index(paths)
+    return 0 if len(levels) == args.count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+This is the level data module, it reads the level files listed in assets/levels/index.json, validates them once and
+keeps them compiled into plain tuples so loading or restarting a level never parses a file again
+"""
+import json
+import marshal
+import os
+from resources import asset_path
+
+# Bumped whenever the compiled layout or the validation changes so old cache files are ignored
+CACHE_VERSION = 3
+# The entries a level file may have, anything else is most likely a misspelt entry and is rejected
+LEVEL_KEYS = {'background', 'floor', 'blocks', 'enemies', 'loadouts', 'next', 'physics'}
+# Entries written by the level generator to describe the level, allowed but not read by the game
+INFO_KEYS = {'seed', 'difficulty', 'solutions'}
+# An index of locally added levels, listed after those of index.json and kept out of the repository like its levels
+LOCAL_INDEX = os.path.join('generated', 'index.json')
+
+
+class LevelFormatError(ValueError):
+    """
+    Raised when a level file does not describe a valid level
+    """
+
+
+class LevelLibrary:
+    """
+    Holds every level listed in the index, compiled into tuples of numbers ready to be turned into sprites
+    """
+
+    def __init__(self, directory, cache_path=None):
+        """
+        Parameters
+        ----------
+        directory : The folder containing index.json and the level files it lists
+        cache_path : Where the compiled levels are stored between runs, or None to only keep them in memory
+        """
+        self.directory = directory
+        self.cache_path = cache_path
+        self.levels = None
+
+    def __len__(self):
+        return len(self.load())
+
+    def get(self, number):
+        """
+        Parameters
+        ----------
+        number : The number of the level, starting at 1 in the order of the index
+
+        Returns
+        -------
+        The compiled level, a dictionary of background, floor, blocks, enemies, loadouts, next and physics
+        """
+        levels = self.load()
+        if not 1 <= number <= len(levels):
+            raise LevelFormatError(f'There is no level {number}, the index lists {len(levels)}')
+        return levels[number - 1]
+
+    def load(self):
+        """
+        Returns
+        -------
+        The list of compiled levels, read from the cache file when none of the level files changed since it was written.
+        The levels listed in the local index, if there is one, follow those of index.json
+        """
+        if self.levels is not None:
+            return self.levels
+        index_path = os.path.join(self.directory, 'index.json')
+        with open(index_path) as file:
+            index = json.load(file)
+        files = [index_path]
+        local_path = os.path.join(self.directory, LOCAL_INDEX)
+        if os.path.exists(local_path):
+            with open(local_path) as file:
+                local_levels = json.load(file).get('levels')
+            if not isinstance(local_levels, list):
+                raise LevelFormatError(f'{LOCAL_INDEX} must list level files under "levels"')
+            index['levels'] = index.get('levels', []) + local_levels
+            files.append(local_path)
+        files += [os.path.join(self.directory, name) for name in index.get('levels', [])]
+        signature = [CACHE_VERSION] + [(name, os.stat(name).st_mtime_ns, os.stat(name).st_size) for name in files]
+        cached = self.read_cache()
+        if cached is not None and cached[0] == signature:
+            self.levels = cached[1]
+            return self.levels
+        self.levels = self.compile_index(index)
+        self.write_cache([signature, self.levels])
+        return self.levels
+
+    def reload(self):
+        """
+        Forgets the compiled levels so they are read again the next time they are used
+        """
+        self.levels = None
+
+    def read_cache(self):
+        """
+        Returns
+        -------
+        The signature and compiled levels stored in the cache file, or None if there is no usable cache
+        """
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'rb') as file:
+                return marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def write_cache(self, data):
+        """
+        Parameters
+        ----------
+        data : The signature of the level files and the levels compiled from them
+
+        The cache is only an optimisation so failing to write it is ignored
+        """
+        if self.cache_path is None:
+            return
+        try:
+            temporary_path = self.cache_path + '.tmp'
+            with open(temporary_path, 'wb') as file:
+                marshal.dump(data, file)
+            os.replace(temporary_path, self.cache_path)
+        except OSError:
+            pass
+
+    def compile_index(self, index):
+        """
+        Parameters
+        ----------
+        index : The parsed index.json
+
+        Returns
+        -------
+        The list of compiled levels, after checking every level file is valid
+        """
+        if not isinstance(index.get('levels'), list) or not index['levels']:
+            raise LevelFormatError('index.json must list at least one level file under "levels"')
+        default_loadouts = compile_loadouts(index.get('loadouts'), 'index.json')
+        levels = []
+        for name in index['levels']:
+            with open(os.path.join(self.directory, name)) as file:
+                try:
+                    data = json.load(file)
+                except json.JSONDecodeError as error:
+                    raise LevelFormatError(f'{name}: {error}') from error
+            levels.append(compile_level(data, name, default_loadouts))
+        for number, level in enumerate(levels, 1):
+            if level['next'] is not None and not 1 <= level['next'] <= len(levels):
+                raise LevelFormatError(f'{index["levels"][number - 1]}: next level {level["next"]} does not exist')
+        return levels
+
+
+def number_pair(value, where):
+    """
+    Parameters
+    ----------
+    value : The value read from the file
+    where : Describes where the value came from for the error message
+
+    Returns
+    -------
+    The value as a tuple of two floats
+    """
+    if not isinstance(value, list) or len(value) != 2 or not all(isinstance(n, (int, float)) for n in value):
+        raise LevelFormatError(f'{where} must be a list of two numbers, not {value!r}')
+    return float(value[0]), float(value[1])
+
+
+def size_pair(value, where):
+    """
+    Parameters
+    ----------
+    value : The value read from the file
+    where : Describes where the value came from for the error message
+
+    Returns
+    -------
+    The value as a tuple of two positive floats
+    """
+    width, height = number_pair(value, where)
+    if width <= 0 or height <= 0:
+        raise LevelFormatError(f'{where} must be positive, not {value!r}')
+    return width, height
+
+
+def number(value, where):
+    """
+    Parameters
+    ----------
+    value : The value read from the file
+    where : Describes where the value came from for the error message
+
+    Returns
+    -------
+    The value as a float
+    """
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise LevelFormatError(f'{where} must be a number, not {value!r}')
+    return float(value)
+
+
+def compile_loadouts(loadouts, where):
+    """
+    Parameters
+    ----------
+    loadouts : A dictionary of class numbers and the list of weapons of that class
+    where : Describes where the loadouts came from for the error message
+
+    Returns
+    -------
+    A dictionary of class numbers and tuples of (x, y, radius, mass, friction, elasticity)
+    """
+    if not isinstance(loadouts, dict) or not loadouts:
+        raise LevelFormatError(f'{where}: "loadouts" must map each class number to a list of weapons')
+    compiled = {}
+    for class_choice, weapons in loadouts.items():
+        if not class_choice.isdigit() or not isinstance(weapons, list) or not weapons:
+            raise LevelFormatError(f'{where}: class {class_choice!r} must be a number with at least one weapon')
+        compiled_weapons = []
+        for i, weapon in enumerate(weapons):
+            place = f'{where}: class {class_choice} weapon {i}'
+            if not isinstance(weapon, dict):
+                raise LevelFormatError(f'{place} must be an object')
+            x, y = number_pair(weapon.get('pos'), place + ' pos')
+            radius = number(weapon.get('radius'), place + ' radius')
+            if radius <= 0:
+                raise LevelFormatError(f'{place} radius must be positive')
+            compiled_weapons.append((x, y, radius, number(weapon.get('mass'), place + ' mass'),
+                                     number(weapon.get('friction', 0.5), place + ' friction'),
+                                     number(weapon.get('elasticity', 0.5), place + ' elasticity')))
+        compiled[int(class_choice)] = tuple(compiled_weapons)
+    return compiled
+
+
+def compile_physics(physics, where):
+    """
+    Parameters
+    ----------
+    physics : The "physics" entry of a level file, or None
+    where : The name of the level file for error messages
+
+    Returns
+    -------
+    The keyword arguments of the level's PhysicsProfile, or None for the default profile
+    """
+    if physics is None:
+        return None
+    if not isinstance(physics, dict):
+        raise LevelFormatError(f'{where}: "physics" must be an object')
+    compiled = {}
+    for key, value in physics.items():
+        place = f'{where}: physics {key}'
+        if key == 'spatial_hash':
+            if not isinstance(value, bool):
+                raise LevelFormatError(f'{place} must be true or false')
+            compiled[key] = value
+        elif key in ('hash_dimension', 'sleep_time', 'idle_speed', 'feature_size'):
+            if value is not None and number(value, place) <= 0:
+                raise LevelFormatError(f'{place} must be positive')
+            compiled[key] = value
+        elif key in ('iterations', 'max_substeps'):
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                raise LevelFormatError(f'{place} must be a whole number of at least 1')
+            compiled[key] = value
+        else:
+            raise LevelFormatError(f'{place} is not a physics setting')
+    return compiled
+
+
+def compile_level(data, where, default_loadouts):
+    """
+    Parameters
+    ----------
+    data : The parsed level file
+    where : The name of the level file for error messages
+    default_loadouts : The compiled loadouts from the index, used when the level does not have its own
+
+    Returns
+    -------
+    The compiled level
+    """
+    if not isinstance(data, dict):
+        raise LevelFormatError(f'{where}: a level must be a JSON object')
+    for key in data:
+        if key not in LEVEL_KEYS and key not in INFO_KEYS:
+            raise LevelFormatError(f'{where}: {key!r} is not a level entry')
+    background = data.get('background')
+    if background is not None and not isinstance(background, str):
+        raise LevelFormatError(f'{where}: "background" must be the name of an image')
+    floor = data.get('floor')
+    if not isinstance(floor, dict):
+        raise LevelFormatError(f'{where}: "floor" must have a start and an end')
+    blocks = []
+    for i, block in enumerate(data.get('blocks', [])):
+        place = f'{where}: block {i}'
+        if not isinstance(block, dict):
+            raise LevelFormatError(f'{place} must be an object')
+        if block.get('body') not in ('static', 'dynamic'):
+            raise LevelFormatError(f'{place} body must be "static" or "dynamic", not {block.get("body")!r}')
+        blocks.append(number_pair(block.get('pos'), place + ' pos') + size_pair(block.get('size'), place + ' size') +
+                      (block['body'], number(block.get('angle', 0), place + ' angle')))
+    enemies = []
+    for i, enemy in enumerate(data.get('enemies', [])):
+        place = f'{where}: enemy {i}'
+        if not isinstance(enemy, dict):
+            raise LevelFormatError(f'{place} must be an object')
+        enemies.append(number_pair(enemy.get('pos'), place + ' pos') + size_pair(enemy.get('size'), place + ' size'))
+    if not enemies:
+        raise LevelFormatError(f'{where}: a level needs at least one enemy')
+    next_level = data.get('next')
+    if next_level is not None and (not isinstance(next_level, int) or isinstance(next_level, bool)):
+        raise LevelFormatError(f'{where}: "next" must be a level number or null')
+    loadouts = compile_loadouts(data['loadouts'], where) if 'loadouts' in data else default_loadouts
+    return {
+        'background': background,
+        'floor': (number_pair(floor.get('start'), where + ' floor start'),
+                  number_pair(floor.get('end'), where + ' floor end')),
+        'blocks': tuple(blocks),
+        'enemies': tuple(enemies),
+        'loadouts': loadouts,
+        'next': next_level,
+        'physics': compile_physics(data.get('physics'), where)
+    }
+
+
+# Every level shipped with the game, compiled once per run and cached between runs
+level_library = LevelLibrary(asset_path('levels'), asset_path('levels', 'levels.cache'))
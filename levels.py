@@ -1,39 +1,123 @@
 import pymunk as pm
 import pygame as pg
-from sprites import Floor, Block, CannonBall, Button, PowerSlider, AngleGraphic, Enemy, ShotIndicator, Label
+from sprites import Floor, Block, CannonBall, Button, PowerSlider, AngleGraphic, ShotIndicator, Label, \
+    TrajectoryPreview, PhysicsSprite
 from pymunk import Vec2d
+from functools import partial
+from render import DirtyRectRenderer, PolygonBatch
+from level_data import level_library
+from collisions import CollisionRegistry
+from physics import PhysicsProfile
+from recording import Recording
+from pools import EntityPools
+
+
+# Seconds a launched weapon stays in play before the next weapon is loaded
+WEAPON_TIMEOUT = 8
+# The smallest impulse of a weapon hitting the level that is heard
+IMPACT_IMPULSE = 200
 
 
 class Level:
-    def __init__(self, game):
+    def __init__(self, game, headless=False, data=None):
         """
 
         Parameters
         ----------
         game : The instance of the Game class providing access to its attributes and methods
+        headless : When True the HUD and background are not created so the level can be simulated without a display
+        data : A compiled level to play instead of the game's chosen level from the library, such as a generated one
 
         This initializes the variables required to run the level
         """
-        self.enemy_list = None
-        self.current_weapon = None
+        self.headless = headless
+        self.data = data
+        self.game = game
+        self.renderer = None if self.headless else DirtyRectRenderer(self.game.display, self.game.dirty_rects,
+                                                                     self.game.profiler)
+        # The level as it was just after it was loaded, restored by restart instead of loading it again
+        self.snapshot = None
+        # The Checkpoint the next attempt resumes from instead of starting at the beginning
+        self.checkpoint = None
+        self.preview = None
+        # The weapons, enemies, blocks and floor of the last level loaded are reused by the next one
+        self.pools = EntityPools(game.pool_sizes)
+        self.space = None
+        self.elements = pg.sprite.Group()
+        self.sliders = pg.sprite.Group()
+        self.labels = pg.sprite.Group()
+        self.reset()
+        if not self.headless:
+            self.create_hud()
+
+    def reset(self):
+        """
+        Empties the level of everything loaded by load_class and load_level into the pools, the HUD is kept
+        """
+        if self.space is not None:
+            self.release()
+        self.reset_attempt()
+        self.profile = PhysicsProfile()
         self.background = None
-        self.shot_power = 0
-        self.shot_angle = 0
         self.image = None
-        self.game = game
-        self.space = pm.Space()
-        self.collision_handler = self.space.add_collision_handler(1, 2)
-        self.collision_handler.begin = self.collision_weapon_enemy
-        self.space.gravity = (0, 981)
+        # The background, floor and static blocks pre-rendered onto one surface, rebuilt when set back to None
+        self.static_layer = None
+        self.create_space()
         self.shapes = pg.sprite.Group()
         self.weapons = pg.sprite.Group()
-        self.elements = pg.sprite.Group()
-        self.sliders = pg.sprite.Group()
         self.enemies = pg.sprite.Group()
-        self.labels = pg.sprite.Group()
+        # The moving blocks and enemies, whose corners are moved into place together each frame
+        self.polygons = PolygonBatch()
+
+    def reset_attempt(self):
+        """
+        Sets the shot, the step count and the physics clock back to the start of an attempt
+        """
+        self.current_weapon = None
+        self.shot_power = 0
+        self.shot_angle = 0
+        self.steps = 0
+        # The substeps the physics steps of the attempt were split into, more than steps while bodies move fast
+        self.substeps = 0
+        # Physics runs in fixed steps however long each frame takes, the leftover time is used to interpolate
+        self.accumulator = 0
+        # The Recording of this attempt while Game.record_inputs is on
+        self.recorder = None
+
+    def release(self):
+        """
+        Takes every body out of the space and hands the sprites loaded, including those destroyed during the attempt,
+        back to the pools in the order they were loaded in
+        """
+        sprites = [*self.weapons, *self.enemies, *self.shapes]
+        if self.snapshot is not None:
+            sprites = [*self.snapshot.weapons, *self.snapshot.enemies, *self.snapshot.shapes, *sprites]
+            self.snapshot = None
+        self.space.remove(*self.space.shapes, *self.space.bodies)
+        self.pools.release(*dict.fromkeys(sprites))
+
+    def create_space(self):
+        """
+        Creates an empty space and the collision registry that handles it
+        """
+        self.space = pm.Space()
+        self.collisions = CollisionRegistry(self.space)
+        self.collisions.on(1, 2, begin=self.collision_weapon_enemy)
+        if not self.headless:
+            self.collisions.on(1, 0, post_solve=self.collision_weapon_impact)
+        self.space.gravity = (0, 981)
+        if self.preview is not None:
+            self.preview.space = self.space
+            self.preview.key = None
+
+    def create_hud(self):
+        """
+        Creates the settings button, shot indicator, sliders and labels drawn over the level
+        """
         settings = Button(self.game, Vec2d(50, 25), (100, 50), 'settings', 18)
         arrow = ShotIndicator(self.game.display, (140, 510))
-        self.elements.add(settings, arrow)
+        self.preview = TrajectoryPreview(self.game.display, self.space)
+        self.elements.add(settings, arrow, self.preview)
         slider_1 = PowerSlider(self.game.display, (60, 100), (200, 50))
         slider_2 = AngleGraphic(self.game.display, (60, 200), (200, 50))
         self.sliders.add(slider_1, slider_2)
@@ -43,35 +127,67 @@ class Level:
 
     def restart(self):
         """
-        Method which re-initializes the level and loads the respective class and level data
+        Puts the level back to the start of the chosen level and load-out. The first attempt at them loads the class
+        and level data and takes a snapshot, every attempt after restores the snapshot instead
         """
-        self.__init__(self.game)
+        self.finish_recording()
+        if self.snapshot is not None and self.snapshot.matches(self):
+            self.snapshot.restore(self)
+            return
+        self.reset()
         self.load_class()
         self.load_level()
+        self.snapshot = LevelSnapshot(self)
 
-    def collision_weapon_enemy(self, arbiter, space, data):
+    def collision_weapon_enemy(self, weapon, enemy, arbiter):
         """
 
         Parameters
         ----------
+        weapon : The projectile that hit the enemy
+        enemy : The enemy that was hit
         arbiter : Encapsulates a pair of colliding shapes and all the data about their collision.
-        space : The basic unit of simulation in Pymunk
-        data : A dictionary which gets passed onto the callbacks
 
         Returns
         -------
         True: When two bodies collide
 
-        Checks which bodies have collided. If the two bodies are a weapon and an enemy, the enemy is removed from the game.
+        When a weapon hits an enemy, the enemy is removed from the game once the physics step has finished
         """
-        shape1, shape2 = arbiter.shapes
-        self.enemy_list = self.enemies.sprites()
-        for enemy in self.enemy_list:
-            if shape2 == enemy.body_shape:
-                enemy.remove()
-                self.enemies.remove(enemy)
+        if enemy is not None:
+            self.collisions.remove_later(enemy, self.enemies)
+            self.play_effect('enemy_destroyed')
         return True
 
+    def collision_weapon_impact(self, weapon, other, arbiter):
+        """
+
+        Parameters
+        ----------
+        weapon : The projectile that hit the level
+        other : The block it hit, or None for the floor
+        arbiter : Encapsulates a pair of colliding shapes and all the data about their collision.
+
+        Plays the impact effect, louder the harder the hit, the first step a launched weapon touches something
+        """
+        if weapon is not None and weapon.is_shot and arbiter.is_first_contact:
+            impulse = arbiter.total_impulse.length
+            if impulse > IMPACT_IMPULSE:
+                self.play_effect('impact', min(1, impulse / (IMPACT_IMPULSE * 10)))
+
+    def play_effect(self, name, volume=1):
+        """
+
+        Parameters
+        ----------
+        name : The name of the sound effect
+        volume : How loud, from 0-1, it is played
+
+        Queues a sound effect with the Game's audio manager, a headless level is silent
+        """
+        if not self.headless:
+            self.game.audio.play_effect(name, volume)
+
     def status(self):
         """
 
@@ -95,149 +211,449 @@ class Level:
         """
         Loads chosen load-out into weapons sprites group
         """
-        if self.game.class_choice == 1:
-            self.weapons.add(CannonBall(self.game.display, Vec2d(140, 510), 10, self.space, 2, 0.5, 0.5))
-            self.weapons.add(CannonBall(self.game.display, Vec2d(30, 100), 20, self.space, 3, 0.5, 0.5))
-            self.weapons.add(CannonBall(self.game.display, Vec2d(10, 100), 5, self.space, 2, 0.5, 0.5))
-
-        else:
-            self.weapons.add(CannonBall(self.game.display, Vec2d(140, 510), 15, self.space, 2.5, 0, 0.5))
-            self.weapons.add(CannonBall(self.game.display, Vec2d(50, 100), 20, self.space, 3, 0.5, 0.5))
-            self.weapons.add(CannonBall(self.game.display, Vec2d(10, 100), 18, self.space, 2, 0.5, 0.5))
+        loadouts = self.level_data()['loadouts']
+        # Any class without a load-out of its own uses the last one
+        loadout = loadouts.get(self.game.class_choice, loadouts[max(loadouts)])
+        for x, y, radius, mass, friction, elasticity in loadout:
+            weapon = self.pools.weapon(self.game.display, Vec2d(x, y), radius, self.space, mass, friction, elasticity)
+            self.weapons.add(weapon)
+            self.collisions.register(weapon)
 
     def load_level(self):
         """
         Loads chosen Level data into shapes and enemies sprite groups
         """
-        if self.game.level_pointer == 1:
-            self.image = self.game.images['game_background_1']
-            self.image = pg.transform.scale(self.image, (1280, 720))
-            floor = Floor(self.game.display, (0, 720), (1280, 720), self.space)
-            blocks = [
-                (Vec2d(85, 620), (170, 200), 'static', 0),
-                (Vec2d(660, 520), (40, 400), 'dynamic', 0),
-                (Vec2d(700, 686), (40, 50), 'static', 0),
-                (Vec2d(860, 636), (360, 50), 'static', 0),
-                (Vec2d(1120, 682), (80, 25), 'static', -0.5),
-                (Vec2d(1180, 661), (40, 100), 'static', 0),
-                (Vec2d(110, 260), (10, 520), 'static', 0)
-
-            ]
-            enemy_1 = Enemy(self.game.display, Vec2d(660, 307.5), (25, 25), self.space)
-            enemy_2 = Enemy(self.game.display, Vec2d(780, 686), (25, 25), self.space)
-            self.shapes.add(floor, (Block(self.game, *block, self.space) for block in blocks))
-            self.enemies.add(enemy_1, enemy_2)
-
-        elif self.game.level_pointer == 2:
-            self.image = self.game.images['game_background_2']
-            self.image = pg.transform.scale(self.image, (1280, 720))
-            floor = Floor(self.game.display, (0, 720), (1280, 720), self.space)
-            blocks = [
-                (Vec2d(85, 620), (170, 200), 'static', 0),
-                (Vec2d(220, 560), (100, 26), 'static', 0),
-                (Vec2d(370, 690), (256, 50), 'static', 0),
-                (Vec2d(600, 610), (225, 71), 'static', -0.8),
-                (Vec2d(853, 586), (85, 250), 'static', 0),
-                (Vec2d(1024, 586), (85, 250), 'static', 0),
-                (Vec2d(1195, 586), (85, 250), 'static', 0),
-                (Vec2d(1024, 411), (427, 100), 'static', 0),
-                (Vec2d(1024, 311), (50, 200), 'dynamic', 0),
-                (Vec2d(896, 111), (13, 100), 'static', 0),
-                (Vec2d(1024, 151), (171, 50), 'dynamic', 0),
-                (Vec2d(1152, 111), (13, 100), 'static', 0),
-                (Vec2d(1024, 47.5), (280, 25), 'static', 0),
-                (Vec2d(110, 260), (10, 520), 'static', 0)
-            ]
-            enemy_1 = Enemy(self.game.display, Vec2d(200, 696), (25, 25), self.space)
-            enemy_2 = Enemy(self.game.display, Vec2d(1024, 86), (25, 25), self.space)
-
-            self.shapes.add(floor, (Block(self.game, *block, self.space) for block in blocks))
-            self.enemies.add(enemy_1, enemy_2)
-
-    def check_events(self):
-        """
-        Handles the events of the level and is abstracted from the run method
+        self.invalidate_static_layer()
+        data = self.level_data()
+        if not self.headless and data['background'] is not None:
+            self.image = self.game.images.scaled(data['background'], (1280, 720))
+        floor = self.pools.floor(self.game.display, *data['floor'], self.space)
+        # Enemies are added to the space before the blocks, the order bodies are added in affects the simulation
+        self.enemies.add(self.pools.enemy(self.game.display, Vec2d(x, y), (width, height), self.space)
+                         for x, y, width, height in data['enemies'])
+        self.collisions.register(*self.enemies)
+        blocks = [(Vec2d(x, y), (width, height), body, angle) for x, y, width, height, body, angle in data['blocks']]
+        self.shapes.add(floor, (self.pools.block(self.game, *block, self.space) for block in blocks))
+        if not self.headless:
+            self.polygons.add(*self.dynamic_blocks(), *self.enemies)
+        # Sized to the bodies just added, so it is applied last
+        self.profile = PhysicsProfile.from_data(data['physics'])
+        self.profile.apply(self.space)
+
+    def level_data(self):
+        """
+        Returns
+        -------
+        The compiled level being played, the one given to the level or else the game's chosen level from the library
+        """
+        if self.data is not None:
+            return self.data
+        return level_library.get(self.game.level_pointer)
+
+    def dynamic_blocks(self):
+        """
+        Returns
+        -------
+        The blocks that can move, in drawing order
+        """
+        return [shapes for shapes in self.shapes if isinstance(shapes, Block) and not shapes.is_static]
+
+    def invalidate_static_layer(self):
+        """
+        Marks the static layer as out of date so it is rebuilt before the next frame, used whenever the background or
+        the static geometry of the level changes
+        """
+        self.static_layer = None
+
+    def build_static_layer(self):
+        """
+        Draws the background, the floor and every static block once onto a surface the size of the screen
+        """
+        self.static_layer = pg.Surface(self.game.display.get_size()).convert()
+        self.static_layer.fill('red')
+        if self.image is not None:
+            self.static_layer.blit(self.image, (0, 0))
+        for shapes in self.shapes:
+            if isinstance(shapes, Floor):
+                shapes.draw(self.static_layer)
+            elif isinstance(shapes, Block) and shapes.is_static:
+                shapes.draw(surface=self.static_layer)
+
+    def components(self, alpha):
+        """
+
+        Parameters
+        ----------
+        alpha : How far, from 0-1, the frame is between the previous physics step and the current one
+
+        Returns
+        -------
+        The (component, key, draw) tuples drawn over the static layer in drawing order, where key changes whenever the
+        component would look different
+        """
+        points = self.polygons.transform(alpha)
+        components = self.polygons.components(points, self.dynamic_blocks())
+        for elements in self.elements:
+            if isinstance(elements, Button):
+                components.append((elements, elements.is_hovered(), elements.draw))
+            if len(self.weapons.sprites()) != 0:
+                if isinstance(elements, ShotIndicator) and not self.weapons.sprites()[0].is_shot:
+                    components.append((elements, self.shot_angle, partial(elements.draw, self.shot_angle)))
+                if isinstance(elements, TrajectoryPreview) and not self.weapons.sprites()[0].is_shot:
+                    elements.compute(self.weapons.sprites()[0], self.shot_power, self.shot_angle)
+                    components.append((elements, elements.key, elements.draw))
+        for weapons in self.weapons:
+            if isinstance(weapons, CannonBall):
+                components.append((weapons, weapons.interpolate(alpha), partial(weapons.draw, alpha)))
+        for sliders in self.sliders:
+            if isinstance(sliders, PowerSlider):
+                components.append((sliders, self.shot_power, partial(sliders.draw, self.shot_power)))
+            if isinstance(sliders, AngleGraphic):
+                components.append((sliders, self.shot_angle, partial(sliders.draw, self.shot_angle)))
+        components.extend(self.polygons.components(points, self.enemies))
+        for label in self.labels:
+            components.append((label, None, label.draw))
+        return components + self.game.profiler.overlay()
+
+    def handle_key(self, key):
+        """
+
+        Parameters
+        ----------
+        key : The key that was pressed
+
+        Launches the current weapon or changes the power or angle of the next shot
         """
         current_weapon = self.weapons.sprites()[0]
-        if len(self.weapons) > 1:
-            next_weapon = self.weapons.sprites()[1]
-        pg.key.set_repeat(250, 20)
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                self.game.running = False
-                self.game.in_game = False
+        if key == pg.K_SPACE and not current_weapon.is_shot:
+            current_weapon.launch(self.shot_power, self.shot_angle)
+            self.play_effect('launch')
+        match key:
+            case pg.K_d if self.shot_power < 1000:
+                self.shot_power += 10
+            case pg.K_a if self.shot_power > 0:
+                self.shot_power -= 10
+            case pg.K_w if self.shot_angle < 90:
+                self.shot_angle += 1
+            case pg.K_s if self.shot_angle > 0:
+                self.shot_angle -= 1
+
+    def handle_events(self, events):
+        """
+
+        Parameters
+        ----------
+        events : The events pulled by the Game this frame
+
+        Handles the events of the level
+        """
+        if self.game.record_inputs and self.recorder is None and self.steps == 0:
+            # Started on the first frame, after the starting power and angle are set. An attempt resumed from a
+            # checkpoint is not recorded as it can not be replayed from the start of the level
+            self.recorder = Recording.for_level(self)
+        for event in events:
             if event.type == pg.KEYDOWN:
-                if event.key == pg.K_SPACE and not current_weapon.is_shot:
-                    current_weapon.launch(self.shot_power, self.shot_angle)
-                match event.key:
-                    case pg.K_d if self.shot_power < 1000:
-                        self.shot_power += 10
-                    case pg.K_a if self.shot_power > 0:
-                        self.shot_power -= 10
-                    case pg.K_w if self.shot_angle < 90:
-                        self.shot_angle += 1
-                    case pg.K_s if self.shot_angle > 0:
-                        self.shot_angle -= 1
+                if self.recorder is not None:
+                    self.recorder.add_key(event.key, self.shot_power, self.shot_angle)
+                self.handle_key(event.key)
             for element in self.elements:
                 if isinstance(element, Button):
                     if element.is_hovered() and event.type == pg.MOUSEBUTTONDOWN:
                         # match-case block for button function
                         match element.low:
                             case 'settings':
+                                self.game.save(checkpoint=True)
                                 self.game.change_state(6)
-                                self.game.states[6].run()
 
+    def finish_recording(self):
+        """
+        Writes the recording of the attempt, if there is one, to the game's recordings folder
+        """
+        if self.recorder is not None and len(self.recorder.frames) > 0:
+            self.recorder.outcome = self.status()
+            self.recorder.save(directory=self.game.recordings_dir)
+        self.recorder = None
+
+    def update_weapons(self, dt):
+        """
+
+        Parameters
+        ----------
+        dt : The time in seconds that passes before the next physics step
+
+        Advances the timer of the launched weapon and loads the next weapon once it has timed out
+        """
+        if len(self.weapons) == 0:
+            return
+        current_weapon = self.weapons.sprites()[0]
         if current_weapon.is_shot:
-            if current_weapon.time_after_collision > 8:
+            if current_weapon.time_after_collision > WEAPON_TIMEOUT:
                 current_weapon.remove()
+                self.collisions.unregister(current_weapon)
                 self.weapons.remove(current_weapon)
                 if len(self.weapons) > 0:
-                    next_weapon.load_weapon()
-            current_weapon.time_after_collision += 1/165
+                    self.weapons.sprites()[0].load_weapon()
+            current_weapon.time_after_collision += dt
+
+    def save_states(self):
+        """
+        Remembers where every dynamic body was before the next physics step so frames can be interpolated
+        """
+        self.polygons.save_states()
+        for weapon in self.weapons:
+            weapon.save_state()
+
+    def step(self, dt):
+        """
+
+        Parameters
+        ----------
+        dt : The length in seconds of the physics step
+
+        Advances the weapon timers and the space by one fixed physics step, split into substeps while anything moves
+        fast enough to pass through the thinnest shape in a single step. The split depends only on the state of the
+        space so replays and headless simulations split their steps the same way
+        """
+        self.update_weapons(dt)
+        substeps = self.profile.substeps(self.space, dt)
+        for _ in range(substeps):
+            self.space.step(dt / substeps)
+        self.steps += 1
+        self.substeps += substeps
+
+    def is_settled(self, speed):
+        """
+
+        Parameters
+        ----------
+        speed : The velocity in pixels per second below which a body counts as resting
+
+        Returns
+        -------
+        True if every dynamic body in the space is moving slower than speed, or has left the level for good
+        """
+        for body in self.space.bodies:
+            if body.body_type == pm.Body.DYNAMIC and body.velocity.length >= speed and not self.has_left(body):
+                return False
+        return True
+
+    def has_left(self, body):
+        """
+
+        Parameters
+        ----------
+        body : A body in the space
+
+        Returns
+        -------
+        True if the body has fallen below every shape in the level, or is beyond its sides and moving away, so it can
+        never come back to hit anything
+        """
+        bounds = self.profile.bounds
+        if bounds is None:
+            return False
+        x, y = body.position
+        return (y > bounds.top or x > bounds.right and body.velocity.x >= 0
+                or x < bounds.left and body.velocity.x <= 0)
+
+    def simulate(self, shots, dt=1 / 165, max_time=60, settle_speed=None):
+        """
+
+        Parameters
+        ----------
+        shots : A sequence of (shot_power, shot_angle) pairs, each fired as soon as a weapon is loaded
+        dt : The length in seconds of each physics step
+        max_time : The simulated time in seconds after which the attempt is given up
+        settle_speed : If given, a launched weapon is timed out early once every dynamic body is slower than this
 
-    def run(self):
+        Returns
+        -------
+        The state of the level, as returned by status(), when it is won, lost, out of shots or out of time
+
+        Steps the space as fast as the CPU allows without pulling events, drawing or waiting on the clock.
+        The level must already be loaded with load_class and load_level.
         """
-        This loop handles the interactivity and drawing of the level
+        shots = list(shots)
+        self.steps = 0
+        settled_time = 0
+        max_steps = int(max_time / dt)
+        while self.status() == 3 and self.steps < max_steps:
+            current_weapon = self.weapons.sprites()[0]
+            if not current_weapon.is_shot:
+                if not shots:
+                    break
+                current_weapon.launch(*shots.pop(0))
+                settled_time = 0
+            elif settle_speed is not None:
+                # A body can be momentarily still (e.g. at the top of its arc) so it has to stay still for a while
+                settled_time = settled_time + dt if self.is_settled(settle_speed) else 0
+                if settled_time > 0.25:
+                    current_weapon.time_after_collision = WEAPON_TIMEOUT + dt
+            self.step(dt)
+        return self.status()
+
+    def start(self):
+        """
+        Starts a new attempt at the chosen level with the chosen load-out, or resumes the one in the checkpoint
         """
-        pg.mixer.music.stop()
-        pg.mixer.music.load(self.game.soundtracks['level_music'])
-        pg.mixer.music.play()
         self.restart()
         self.game.in_game = True
         self.shot_power = 100
         self.shot_angle = 0
-        while self.status() == 3 and self.game.in_game:
-            self.check_events()
-            self.game.display.fill('red')
-            if self.image is not None:
-                self.game.display.blit(self.image, (0, 0))
-            for shapes in self.shapes:
-                if isinstance(shapes, Block):
-                    shapes.draw()
-                elif isinstance(shapes, Floor):
-                    shapes.draw()
-            for elements in self.elements:
-                if isinstance(elements, Button):
-                    elements.draw()
-                if len(self.weapons.sprites()) != 0:
-                    if isinstance(elements, ShotIndicator) and not self.weapons.sprites()[0].is_shot:
-                        elements.draw(self.shot_angle)
-            for weapons in self.weapons:
-                if isinstance(weapons, CannonBall):
-                    weapons.draw()
-            for sliders in self.sliders:
-                if isinstance(sliders, PowerSlider):
-                    sliders.draw(self.shot_power)
-                if isinstance(sliders, AngleGraphic):
-                    sliders.draw(self.shot_angle)
-            for enemy in self.enemies:
-                enemy.draw()
-            for label in self.labels:
-                label.draw()
-            pg.display.update()
-            self.game.clock.tick(165)
-            self.space.step(1 / 165)
+        if self.checkpoint is not None and self.checkpoint.apply(self):
+            self.checkpoint = None
+            return
+        self.checkpoint = None
+        # A new attempt replaces the one in the checkpoint
+        self.game.checkpoint = None
+        self.game.save()
+
+    def enter(self):
+        """
+        Called by the Game whenever the level becomes the current state. A new attempt is started unless the level is
+        being resumed from the settings menu, or continued from a checkpoint
+        """
+        self.game.audio.play_music('level_music')
+        if not self.game.in_game or self.status() != 3 or self.checkpoint is not None:
+            self.start()
+        pg.key.set_repeat(250, 20)
+        # Whatever was on screen before belongs to another state
+        self.renderer.refresh()
+
+    def is_idle(self):
+        """
+        Returns
+        -------
+        False, the physics keeps running between events so the level draws every frame
+        """
+        return False
+
+    def update(self, dt):
+        """
+
+        Parameters
+        ----------
+        dt : The time in seconds the last frame took
+
+        Runs as many fixed physics steps as fit in the time that has passed, then shows the post game menu once the
+        level is won or lost
+        """
+        step_time = 1 / self.game.physics_rate
+        self.accumulator += dt
+        steps = 0
+        substeps = self.substeps
+        while self.accumulator >= step_time and steps < self.game.max_physics_steps:
+            self.save_states()
+            self.step(step_time)
+            self.accumulator -= step_time
+            steps += 1
+        if steps == self.game.max_physics_steps:
+            # Drops the time the physics could not catch up on so one slow frame does not snowball
+            self.accumulator %= step_time
+        self.game.profiler.count('substeps', self.substeps - substeps)
+        if self.recorder is not None:
+            self.recorder.add_frame(steps)
+        autosave_steps = self.game.autosave_interval * self.game.physics_rate
+        if steps and self.steps // autosave_steps != (self.steps - steps) // autosave_steps:
+            self.game.save(checkpoint=True)
         if self.status() != 3:
+            self.finish_recording()
+            if self.status() == 1:
+                self.game.add_completed_level()
+            self.game.checkpoint = None
+            self.game.save()
             self.game.change_state(8)
             self.game.states[self.game.get_state()].create_buttons(self.status())
-            self.game.states[self.game.get_state()].run()
+
+    def draw(self):
+        """
+        Draws the frame, interpolated between the last two physics steps by the time left over in the accumulator
+        """
+        alpha = self.accumulator * self.game.physics_rate
+        if self.static_layer is None:
+            self.build_static_layer()
+        self.renderer.set_background(self.static_layer)
+        self.renderer.render(self.components(alpha))
+
+
+class LevelSnapshot:
+    """
+    The bodies, shapes and sprites of a level just after it was loaded. Restoring it moves every body back to where it
+    started and adds it to a new space in the order it was first added in, so an attempt plays out exactly as it would
+    in a freshly loaded level without building any sprite, shape or HUD element again
+    """
+
+    def __init__(self, level):
+        """
+        Parameters
+        ----------
+        level : The Level just loaded with load_class and load_level
+        """
+        self.level_pointer = level.game.level_pointer
+        self.class_choice = level.game.class_choice
+        self.data = level.level_data()
+        self.weapons = level.weapons.sprites()
+        self.enemies = level.enemies.sprites()
+        self.shapes = level.shapes.sprites()
+        self.bodies = level.space.bodies
+        self.body_shapes = level.space.shapes
+        self.states = [(body.position, body.angle, body.velocity, body.angular_velocity) for body in self.bodies]
+        self.profile = level.profile
+
+    def matches(self, level):
+        """
+        Parameters
+        ----------
+        level : The Level about to be restarted
+
+        Returns
+        -------
+        True if the snapshot is of the level and load-out the game has chosen, and the level was not reloaded since
+        """
+        return (self.level_pointer == level.game.level_pointer and self.class_choice == level.game.class_choice
+                and level.level_data() is self.data)
+
+    def restore(self, level):
+        """
+        Parameters
+        ----------
+        level : The Level the snapshot was taken of
+
+        Puts the level back to how it was when the snapshot was taken. The HUD, the static layer and the polygon batch
+        are kept as they are
+        """
+        space = level.space
+        space.remove(*space.shapes, *space.bodies)
+        level.reset_attempt()
+        level.create_space()
+        # Put back before the bodies are added, as the space sizes its index to the velocity of each body it adds
+        for body, (position, angle, velocity, angular_velocity) in zip(self.bodies, self.states):
+            # Chipmunk keeps the push out of overlaps from the last step to move the body by on the next, a step of
+            # no time spends it without moving the body
+            pm.Body.update_position(body, 0)
+            body.position = position
+            body.angle = angle
+            body.velocity = velocity
+            body.angular_velocity = angular_velocity
+            body.force = (0, 0)
+            body.torque = 0
+        level.space.add(*self.bodies, *self.body_shapes)
+        level.profile = self.profile
+        self.profile.apply(level.space)
+        for weapon in self.weapons:
+            weapon.space = level.space
+            weapon.is_shot = False
+            weapon.time_after_collision = 0
+        for enemy in self.enemies:
+            enemy.space = level.space
+        for sprite in (*self.weapons, *self.enemies, *self.shapes):
+            if isinstance(sprite, PhysicsSprite):
+                sprite.previous_position = None
+        level.collisions.register(*self.weapons, *self.enemies)
+        level.weapons.empty()
+        level.weapons.add(*self.weapons)
+        level.enemies.empty()
+        level.enemies.add(*self.enemies)
+        level.shapes.empty()
+        level.shapes.add(*self.shapes)
+        level.polygons.save_states()
@@ -2,8 +2,12 @@
 
 import pygame as pg
 from menu import StartMenu, LevelMenu, OptionsMenu, ClassMenu, GameSettingsMenu, PostGameMenu
-import os
 from levels import Level
+from resources import AssetManager, asset_path
+from profiler import FrameProfiler
+from audio import AudioManager
+from save import SaveGame, SaveWriter, SaveError, Checkpoint, SAVE_PATH
+from recording import RECORDINGS_DIR
 
 
 class Game:
@@ -13,45 +17,68 @@ class Game:
     This initializes the variables required to run the game
     """
 
-    def __init__(self):
+    def __init__(self, save_path=SAVE_PATH, recordings_dir=RECORDINGS_DIR):
+        """
+        Parameters
+        ----------
+        save_path : The file the progress, settings and checkpoint are read from and written to
+        recordings_dir : The folder the recordings of attempts are written to
+        """
         self.running = True
         self.in_game = True
         self.display = pg.display.set_mode((1280, 720))
         self.clock = pg.time.Clock()
+        # The level renders at frame_rate while its physics steps at physics_rate, at most max_physics_steps per frame
+        self.frame_rate = 165
+        self.physics_rate = 165
+        self.max_physics_steps = 8
+        # Only the areas of the screen that changed are pushed to the window
+        self.dirty_rects = True
+        # Blocks are drawn with their textures instead of as flat polygons
+        self.block_textures = True
+        # An idle menu sleeps until the next event, waking at least this often in milliseconds
+        self.idle_timeout = 500
+        # Times every frame phase by phase when enabled, F3 turns it and its overlay on and off while playing
+        self.profile_frames = False
+        # Writes the inputs of every attempt at a level to the recordings folder so it can be replayed
+        self.record_inputs = False
+        self.recordings_dir = recordings_dir
+        # Seconds of play between the checkpoints written while a level is being played
+        self.autosave_interval = 30
+        # How many weapons, enemies, blocks and floors are kept to build the next level from, see pools.POOL_SIZES
+        self.pool_sizes = None
         self.class_choice = None
         self.volume = 1
         # Stack is initialised with the first state already on it
         self.state_stack = [1]
         self.levels_completed = []
         self.level_pointer = None
-        pg.mixer.music.set_volume(self.volume)
+        # The attempt at a level left part way through, which the start menu offers to continue
+        self.checkpoint = None
+        # Progress and settings are read back before anything uses them and written on a background thread
+        self.saves = SaveWriter(save_path)
+        try:
+            SaveGame.load(save_path).apply(self)
+        except (OSError, SaveError):
+            # There is no save yet, or one from another version, which the next save replaces
+            pass
         self.soundtracks = {
-            'menu_music': os.path.join(os.path.dirname(os.path.realpath(__file__)), "assets", "soundtracks",
-                                       'menumusic.mp3'),
-            'level_music': os.path.join(os.path.dirname(os.path.realpath(__file__)), "assets", "soundtracks",
-                                        'levelmusic.mp3')
-        }
-        self.images = {
-            'game_background_1': pg.image.load(
-                os.path.join(os.path.dirname(os.path.realpath(__file__)), "assets", "Images",
-                             "gamebackground.jpg")),
-            'block_static_image': pg.image.load(
-                os.path.join(os.path.dirname(os.path.realpath(__file__)), 'assets', 'Images',
-                             'blockstaticimage.jpg')),
-            'block_dynamic_image': pg.image.load(
-                os.path.join(os.path.dirname(os.path.realpath(__file__)), 'assets', 'Images',
-                             'blockimage.jpg')),
-            'menu_background': pg.image.load(
-                os.path.join(os.path.dirname(os.path.realpath(__file__)), 'assets', 'Images',
-                             'menubackground.jpg')),
-            'button_image': pg.image.load(
-                os.path.join(os.path.dirname(os.path.realpath(__file__)), 'assets', 'Images',
-                             'buttonimage.jpg')),
-            'game_background_2': pg.image.load(
-                os.path.join(os.path.dirname(os.path.realpath(__file__)), "assets", "Images",
-                             "gamebackground2.jpg"))
-
+            'menu_music': asset_path("soundtracks", 'menumusic.mp3'),
+            'level_music': asset_path("soundtracks", 'levelmusic.mp3')
         }
+        # Keeps the music streaming between states that share a track and plays the sound effects
+        self.audio = AudioManager(self.soundtracks)
+        self.audio.set_volume(self.volume)
+        # Images are loaded and converted the first time they are used
+        self.images = AssetManager({
+            'game_background_1': asset_path("Images", "gamebackground.jpg"),
+            'block_static_image': asset_path('Images', 'blockstaticimage.jpg'),
+            'block_dynamic_image': asset_path('Images', 'blockimage.jpg'),
+            'menu_background': asset_path('Images', 'menubackground.jpg'),
+            'button_image': asset_path('Images', 'buttonimage.jpg'),
+            'game_background_2': asset_path("Images", "gamebackground2.jpg")
+        })
+        self.profiler = FrameProfiler(self, self.profile_frames)
 
         self.states = {
             1: StartMenu(self),
@@ -70,6 +97,27 @@ class Game:
         if self.level_pointer not in self.levels_completed:
             self.levels_completed.append(self.level_pointer)
 
+    def save(self, checkpoint=False):
+        """
+        Parameters
+        ----------
+        checkpoint : Whether the attempt at the level in progress, if there is one, is saved as the checkpoint
+
+        Hands the progress, settings and checkpoint to the save writer, the frame loop does not wait for the disk
+        """
+        if checkpoint:
+            self.checkpoint = Checkpoint.from_level(self.states[5]) or self.checkpoint
+        self.saves.write(SaveGame.from_game(self))
+
+    def resume_checkpoint(self):
+        """
+        Goes back to the attempt saved in the checkpoint, as if the level and load-out had been picked in the menus
+        """
+        self.level_pointer = self.checkpoint.level_pointer
+        self.class_choice = self.checkpoint.class_choice
+        self.states[5].checkpoint = self.checkpoint
+        self.state_stack = [1, 2, 4, 5]
+
     def change_state(self, state):
         """
         Parameters
@@ -100,17 +148,55 @@ class Game:
 
     def run(self):
         """
-        This is the main Game loop which runs the state at the top of the stack
+        This is the main Game loop, the only frame loop and the only place events are pulled. Each frame the state at
+        the top of the stack handles the events, updates and draws, so changing state never nests another loop.
+        A state that is idle is not drawn again until an event arrives
         """
-
+        active = None
+        frame_time = 0
+        waiting = []
         while self.running:
-            for event in pg.event.get():
+            state = self.states[self.get_state()]
+            if state is not active:
+                active = state
+                state.enter()
+                # The time spent before the state was entered is not part of its first frame
+                self.clock.tick()
+                frame_time = 0
+            self.profiler.begin_frame(type(state).__name__)
+            events = waiting + pg.event.get()
+            waiting = []
+            for event in events:
+                self.profiler.handle_event(event)
+                self.audio.handle_event(event)
                 if event.type == pg.QUIT:
                     self.running = False
-            self.display.fill((0, 0, 0))
-            self.states[self.state_stack[-1]].run()
-            pg.display.update()
-            self.clock.tick(60)
+                    self.in_game = False
+            state.handle_events(events)
+            self.profiler.mark('events')
+            # A state that was left while handling its events is neither updated nor drawn again
+            if self.states[self.get_state()] is state:
+                state.update(frame_time)
+                self.profiler.mark('physics')
+            if self.states[self.get_state()] is state:
+                state.draw()
+                self.audio.update()
+                self.profiler.mark('display')
+            if self.states[self.get_state()] is state and state.is_idle():
+                # Blocks instead of ticking, the event that wakes it is handled next frame
+                event = pg.event.wait(self.idle_timeout)
+                if event.type != pg.NOEVENT:
+                    waiting.append(event)
+                frame_time = self.clock.tick() / 1000
+            else:
+                frame_time = self.clock.tick(self.frame_rate) / 1000
+            self.profiler.mark('wait')
+            self.profiler.end_frame()
+        self.states[5].finish_recording()
+        self.save(checkpoint=True)
+        self.saves.close()
+        # Whatever the profiler timed this session is kept for comparing frames later
+        self.profiler.export()
 
 
 if __name__ == "__main__":
@@ -2,7 +2,10 @@
 This is the Menu module, it contains the parent Menu class and its children: StartMenu, LevelMenu, OptionsMenu, ClassMenu, GameSettingsMenu, PostGameMenu
 """
 import pygame as pg
+from functools import partial
 from sprites import Button, Label, VolumeSlider
+from render import DirtyRectRenderer
+from level_data import level_library
 
 
 class Menu:
@@ -15,40 +18,78 @@ class Menu:
         Initializes the common attributes among its children
         """
         self.game = game
-        self.in_menu = True
         self.elements = pg.sprite.Group()
-        self.music = None
+        # The track played while the menu is shown, None keeps the one already playing
+        self.music = 'menu_music'
         self.volume = self.game.volume
-        self.image = self.game.images['menu_background']
-        self.image = pg.transform.scale(self.image, (1280, 720))
-
-    def run(self):
-        """
-        This loop handles the interactivity and drawing of the menus
-        """
-        self.in_menu = True
-        pg.mixer.music.stop()
-        pg.mixer.music.load(self.game.soundtracks['menu_music'])
-        pg.mixer.music.play()
-        while self.in_menu:
-            self.check_events()
-            if hasattr(self, 'update_locked'):
-                self.update_locked()
-            self.game.display.fill("red")
-            if self.image is not None:
-                self.game.display.blit(self.image, (0, 0))
-            for element in self.elements:
-                if isinstance(element, VolumeSlider):
-                    element.draw(self.volume)
-                else:
-                    element.draw()
+        # The volume when the progress was last saved, a click that did not move the slider saves nothing
+        self.saved_volume = self.volume
+        self.image = self.game.images.scaled('menu_background', (1280, 720))
+        self.renderer = DirtyRectRenderer(self.game.display, self.game.dirty_rects, self.game.profiler)
+        self.renderer.set_background(self.image)
+        # Whether the last frame drew anything, a menu that did not is left waiting for the next event
+        self.changed = True
+
+    def components(self):
+        """
+        Returns
+        -------
+        The (component, key, draw) tuples of the menu elements in drawing order, where key changes whenever the
+        element would look different
+        """
+        components = []
+        for element in self.elements:
+            if isinstance(element, VolumeSlider):
+                components.append((element, self.volume, partial(element.draw, self.volume)))
+            elif isinstance(element, Button):
+                components.append((element, element.is_hovered(), element.draw))
+            else:
+                components.append((element, None, element.draw))
+        return components + self.game.profiler.overlay()
+
+    def enter(self):
+        """
+        Called by the Game whenever the menu becomes the current state
+        """
+        self.game.audio.play_music(self.music)
+        # Another menu's slider may have changed the volume since this menu was shown
+        self.volume = self.game.volume
+        self.saved_volume = self.volume
+        # Whatever was on screen before belongs to another state
+        self.renderer.refresh()
+        self.changed = True
 
-            pg.display.update()
-            self.game.clock.tick(165)
+    def is_idle(self):
+        """
+        Returns
+        -------
+        True if nothing on screen changed last frame and no slider is being dragged, so the menu only needs to be
+        drawn again after the next event
+        """
+        return not self.changed and not pg.mouse.get_pressed()[0]
+
+    def update(self, dt):
+        """
+        Parameters
+        ----------
+        dt : The time in seconds the last frame took
+        """
+        if hasattr(self, 'update_locked'):
+            self.update_locked()
+
+    def draw(self):
+        """
+        Draws the elements of the menu that changed since the last frame
+        """
+        self.changed = len(self.renderer.render(self.components())) > 0
 
-    def check_events(self):
+    def handle_events(self, events):
         """
-        The event handling which controls the interactivity that has been abstracted from the run method
+        Parameters
+        ----------
+        events : The events pulled by the Game this frame
+
+        The event handling which controls the interactivity of the menus
         """
         if pg.mouse.get_pressed()[0] == 1:
             for element in self.elements:
@@ -57,11 +98,13 @@ class Menu:
                         mouse_pos = pg.mouse.get_pos()
                         percentage = ((mouse_pos[0] - element.x) // (element.width / 100)) / 100
                         self.volume = 1 * percentage
-                        pg.mixer.music.set_volume(self.volume)
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                self.game.running = False
-                self.in_menu = False
+                        self.game.volume = self.volume
+                        self.game.audio.set_volume(self.volume)
+        for event in events:
+            if event.type == pg.MOUSEBUTTONUP and self.volume != self.saved_volume:
+                # Saved once the slider is let go instead of every frame it is dragged
+                self.saved_volume = self.volume
+                self.game.save()
             if event.type == pg.MOUSEBUTTONDOWN:
                 for element in self.elements:
                     if isinstance(element, Button):
@@ -72,16 +115,19 @@ class Menu:
                                     self.game.running = False
                                 case "play":
                                     self.game.change_state(2)
+                                case "continue":
+                                    self.game.resume_checkpoint()
                                 case "options":
                                     self.game.change_state(3)
                                 case "back":
                                     self.game.state_stack.pop()
-                                case "level 1":
+                                case "previous":
+                                    self.show_page(self.page - 1)
+                                case "next":
+                                    self.show_page(self.page + 1)
+                                case level if level.startswith("level "):
                                     self.game.change_state(4)
-                                    self.game.level_pointer = 1
-                                case "level 2":
-                                    self.game.change_state(4)
-                                    self.game.level_pointer = 2
+                                    self.game.level_pointer = int(level.split()[1])
                                 case "restart":
                                     self.game.state_stack.pop()
                                     self.game.states[self.game.state_stack[-1]].restart()
@@ -102,9 +148,12 @@ class Menu:
                                 case "play again":
                                     self.game.state_stack.pop()
                                 case "next level":
-                                    self.game.level_pointer = 2
-                                    self.game.change_state(4)
-                            self.in_menu = False
+                                    self.game.level_pointer = level_library.get(self.game.level_pointer)['next']
+                                    # Back past the finished level to the class menu, so the stack does not grow
+                                    self.game.state_stack.pop()
+                                    self.game.state_stack.pop()
+                            # The rest of the events were meant for this menu, which is no longer shown
+                            return
 
 
 class StartMenu(Menu):
@@ -122,6 +171,18 @@ class StartMenu(Menu):
         end = Button(self.game, (540, 560), (200, 100), 'quit', 40)
         options = Button(self.game, (50, 600), (250, 100), 'options', 40)
         self.elements.add(title, play, end, options)
+        self.resume = Button(self.game, (540, 260), (200, 100), 'continue', 40)
+
+    def enter(self):
+        """
+        Called by the Game whenever the menu becomes the current state, shows the continue button while there is a
+        checkpoint to continue from
+        """
+        super().enter()
+        if self.game.checkpoint is not None:
+            self.elements.add(self.resume)
+        else:
+            self.elements.remove(self.resume)
 
 
 class LevelMenu(Menu):
@@ -131,14 +192,50 @@ class LevelMenu(Menu):
         ----------
         game : The instance of the Game class providing access to its attributes and methods
 
-        Creates the Buttons and Labels of the Main Menu
+        Creates the Buttons and Labels of the Level Menu
         """
         super().__init__(game)
         title = Label(self.game, (540, 100), (200, 100), 'Levels', 50)
-        level1 = Button(self.game, (540, 410), (200, 100), 'Level 1', 40)
-        level2 = Button(self.game, (540, 560), (200, 100), 'Level 2', 40)
-        back = Button(self.game, (50, 600), (250, 100), 'back', 40)
-        self.elements.add(title, level1, level2, back)
+        height = self.game.display.get_height()
+        # The back and page buttons share the bottom row, the level buttons fill the rows between it and the title
+        back = Button(self.game, (50, height - 120), (250, 100), 'back', 40)
+        self.previous_page = Button(self.game, (780, height - 120), (200, 100), 'previous', 40)
+        self.next_page = Button(self.game, (1020, height - 120), (200, 100), 'next', 40)
+        self.elements.add(title, back)
+        rows = max(1, (height - 120 - 250 + 20) // 120)
+        per_page = rows * 4
+        # One button for every level in the index, in rows of four centred under the title, a page at a time
+        count = len(level_library)
+        self.pages = []
+        for start in range(0, count, per_page):
+            page = []
+            for i in range(start, min(start + per_page, count)):
+                row, column = divmod(i - start, 4)
+                columns = min(4, count - start - row * 4)
+                x = 640 - (columns * 240 - 40) // 2 + column * 240
+                page.append(Button(self.game, (x, 250 + row * 120), (200, 100), f'Level {i + 1}', 40))
+            self.pages.append(page)
+        self.page = 0
+        self.show_page(0)
+
+    def show_page(self, page):
+        """
+        Parameters
+        ----------
+        page : The index of the page of level buttons to show, kept within the pages there are
+
+        Swaps the level buttons shown for those of page, with a previous and next button while there are pages before
+        or after it
+        """
+        if not self.pages:
+            return
+        self.elements.remove(*self.pages[self.page], self.previous_page, self.next_page)
+        self.page = max(0, min(page, len(self.pages) - 1))
+        self.elements.add(*self.pages[self.page])
+        if self.page > 0:
+            self.elements.add(self.previous_page)
+        if self.page < len(self.pages) - 1:
+            self.elements.add(self.next_page)
 
 
 class OptionsMenu(Menu):
@@ -184,6 +281,8 @@ class GameSettingsMenu(Menu):
         Creates the buttons and labels of the in game Settings Menu
         """
         super().__init__(game)
+        # Paused over the level, whose music carries on
+        self.music = None
         title = Label(self.game, (540, 100), (200, 100), 'Settings', 50)
         resume = Button(self.game, (500, 300), (280, 100), 'resume', 40)
         restart = Button(self.game, (500, 450), (280, 100), 'restart', 40)
@@ -211,7 +310,7 @@ class PostGameMenu(Menu):
             title = Label(self.game, (540, 100), (200, 100), 'Victory', 50)
         elif status == 2:
             title = Label(self.game, (540, 100), (200, 100), 'Defeat', 50)
-        if self.game.level_pointer == 1 and status == 1:
+        if status == 1 and level_library.get(self.game.level_pointer)['next'] is not None:
             next_level = Button(self.game, (500, 300), (280, 100), 'next level', 40)
             play_again = Button(self.game, (500, 450), (280, 100), 'play again', 40)
             main_menu = Button(self.game, (500, 600), (280, 100), 'main menu', 40)
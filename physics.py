@@ -0,0 +1,242 @@
+"""
+This is the physics module, it contains the PhysicsProfile which tunes a level's space for the number of bodies in it,
+and a stress scene generator to measure when each setting pays off
+"""
+import math
+import statistics
+import sys
+import time
+import pymunk as pm
+import pymunk.batch
+
+
+class PhysicsProfile:
+    """
+    The settings applied to a level's space: spatial hashing, sleeping of settled bodies, solver iterations and how
+    finely each step is split while bodies move fast enough to pass through thin shapes
+    """
+
+    def __init__(self, spatial_hash=False, hash_dimension=None, sleep_time=None, idle_speed=None, iterations=10,
+                 max_substeps=8, feature_size=None):
+        """
+        Parameters
+        ----------
+        spatial_hash : Whether the space uses a spatial hash instead of the default bounding box tree
+        hash_dimension : The size of a hash cell, worked out from the sizes of the shapes in the space if not given
+        sleep_time : Seconds a body has to stay idle before it falls asleep, or None to never sleep
+        idle_speed : The speed below which a body counts as idle, or None to let pymunk work it out from gravity
+        iterations : How many iterations the solver uses each step
+        max_substeps : The most substeps a step is split into, 1 to never split steps
+        feature_size : The thickness of the thinnest shape, measured from the shapes in the space if not given
+        """
+        self.spatial_hash = spatial_hash
+        self.hash_dimension = hash_dimension
+        self.sleep_time = sleep_time
+        self.idle_speed = idle_speed
+        self.iterations = iterations
+        self.max_substeps = max_substeps
+        self.feature_size = feature_size
+        # The furthest a body may move in one substep, half the thinnest shape so it cannot step over it
+        self.substep_distance = None
+        # The box around every shape in the space, a body that cannot reach it within a step has nothing to pass through
+        self.bounds = None
+        # Filled with the position and velocity of every body in the space at once
+        self.buffer = pymunk.batch.Buffer()
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Parameters
+        ----------
+        data : The compiled "physics" entry of a level, or None for the default profile
+
+        Returns
+        -------
+        The profile the level asks for
+        """
+        return cls(**(data or {}))
+
+    def apply(self, space):
+        """
+        Parameters
+        ----------
+        space : The space to tune, after the level's bodies have been added so the hash and substeps can be
+            sized to them
+        """
+        space.iterations = self.iterations
+        if self.sleep_time is not None:
+            space.sleep_time_threshold = self.sleep_time
+        if self.idle_speed is not None:
+            space.idle_speed_threshold = self.idle_speed
+        if self.spatial_hash:
+            dimension = self.hash_dimension or hash_dimension(space)
+            # Chipmunk recommends about 10 times as many cells as there are shapes
+            space.use_spatial_hash(dimension, max(1000, len(space.shapes) * 10))
+        self.substep_distance = (self.feature_size or feature_size(space)) / 2
+        self.bounds = None
+        for shape in space.shapes:
+            bb = shape.cache_bb()
+            self.bounds = bb if self.bounds is None else self.bounds.merge(bb)
+
+    def substeps(self, space, dt):
+        """
+        Parameters
+        ----------
+        space : The space the profile was applied to
+        dt : The length in seconds of the step about to be taken
+
+        Returns
+        -------
+        How many substeps the step is split into so the fastest body moves no further than substep_distance in
+        each one, 1 while everything is slow or resting. Bodies too far outside the bounds to reach them within the
+        step, such as a projectile falling off the screen, are not counted
+        """
+        if self.max_substeps <= 1 or not self.substep_distance or self.bounds is None:
+            return 1
+        self.buffer.clear()
+        pymunk.batch.get_space_bodies(space, pymunk.batch.BodyFields.POSITION | pymunk.batch.BodyFields.VELOCITY,
+                                      self.buffer)
+        # A plain loop over the buffer is quicker than NumPy for the few dozen bodies in a level
+        values = memoryview(self.buffer.float_buf()).cast('d')
+        bounds = self.bounds
+        speed = 0
+        for i in range(0, len(values), 4):
+            body_speed = math.hypot(values[i + 2], values[i + 3])
+            if body_speed > speed:
+                travel = body_speed * dt
+                if (bounds.left - travel <= values[i] <= bounds.right + travel
+                        and bounds.bottom - travel <= values[i + 1] <= bounds.top + travel):
+                    speed = body_speed
+        return min(self.max_substeps, max(1, math.ceil(speed * dt / self.substep_distance)))
+
+    def __repr__(self):
+        return (f'PhysicsProfile(spatial_hash={self.spatial_hash}, hash_dimension={self.hash_dimension}, '
+                f'sleep_time={self.sleep_time}, idle_speed={self.idle_speed}, iterations={self.iterations}, '
+                f'max_substeps={self.max_substeps}, feature_size={self.feature_size})')
+
+
+def hash_dimension(space):
+    """
+    Parameters
+    ----------
+    space : A space with shapes in it
+
+    Returns
+    -------
+    A hash cell size close to the size of a typical shape, which is what makes a spatial hash fast
+    """
+    sizes = []
+    for shape in space.shapes:
+        bb = shape.cache_bb()
+        sizes.append(max(bb.right - bb.left, bb.bottom - bb.top))
+    # The median ignores the few very large shapes such as the floor
+    return max(8.0, statistics.median(sizes)) if sizes else 32.0
+
+
+def feature_size(space):
+    """
+    Parameters
+    ----------
+    space : A space with shapes in it
+
+    Returns
+    -------
+    The thickness of the thinnest shape: the diameter of a circle or a rounded segment, or the shortest side of a
+    polygon
+    """
+    sizes = []
+    for shape in space.shapes:
+        if isinstance(shape, pm.Poly):
+            vertices = shape.get_vertices()
+            sizes.append(min(abs(a - b) for a, b in zip(vertices, vertices[1:] + vertices[:1])) + 2 * shape.radius)
+        elif shape.radius > 0:
+            sizes.append(2 * shape.radius)
+    return min(sizes, default=0)
+
+
+def stress_scene(count, size=20, gap=4, width=1280, floor=720, profile=None):
+    """
+    Parameters
+    ----------
+    count : How many dynamic blocks to stack
+    size : The width and height of each block
+    gap : The space between the columns
+    width : The width of the scene the columns are spread across
+    floor : The height of the floor
+    profile : The PhysicsProfile to apply, the default profile if not given
+
+    Returns
+    -------
+    A space with a floor and count blocks stacked in columns, using the same material as the level blocks
+    """
+    space = pm.Space()
+    space.gravity = (0, 981)
+    ground = pm.Segment(space.static_body, (0, floor), (width, floor), 9)
+    ground.elasticity = 0.5
+    ground.friction = 0.7
+    space.add(ground)
+    columns = max(1, min(count, (width - gap) // (size + gap)))
+    for i in range(count):
+        column, row = i % columns, i // columns
+        body = pm.Body(body_type=pm.Body.DYNAMIC)
+        body.position = (gap + size / 2 + column * (size + gap), floor - 9 - size / 2 - row * size)
+        shape = pm.Poly.create_box(body, (size, size))
+        shape.mass = 2
+        shape.elasticity = 0.5
+        shape.friction = 0.7
+        space.add(body, shape)
+    (profile or PhysicsProfile()).apply(space)
+    return space
+
+
+def time_steps(space, steps=300, dt=1 / 165):
+    """
+    Parameters
+    ----------
+    space : The space to step
+    steps : How many steps to time
+    dt : The length in seconds of each step
+
+    Returns
+    -------
+    The average time one step took in milliseconds
+    """
+    start = time.perf_counter()
+    for _ in range(steps):
+        space.step(dt)
+    return (time.perf_counter() - start) * 1000 / steps
+
+
+def compare(counts=(100, 500, 1000, 2000), settle_steps=330, steps=300):
+    """
+    Parameters
+    ----------
+    counts : The numbers of blocks to try
+    settle_steps : How many steps each scene runs before it is timed, long enough for the towers to settle
+    steps : How many steps are timed
+
+    Returns
+    -------
+    The lines of a table of milliseconds per step for each profile and number of blocks
+    """
+    profiles = {
+        'default': PhysicsProfile(),
+        'spatial hash': PhysicsProfile(spatial_hash=True),
+        'sleeping': PhysicsProfile(sleep_time=0.5),
+        'hash + sleeping': PhysicsProfile(spatial_hash=True, sleep_time=0.5),
+        'hash + sleeping, 5 iterations': PhysicsProfile(spatial_hash=True, sleep_time=0.5, iterations=5),
+    }
+    lines = ['profile'.ljust(32) + ''.join(f'{count:>10}' for count in counts)]
+    for name, profile in profiles.items():
+        row = name.ljust(32)
+        for count in counts:
+            space = stress_scene(count, profile=profile)
+            for _ in range(settle_steps):
+                space.step(1 / 165)
+            row += f'{time_steps(space, steps):>8.2f}ms'
+        lines.append(row)
+    return lines
+
+
+if __name__ == "__main__":
+    print('\n'.join(compare([int(arg) for arg in sys.argv[1:]] or (100, 500, 1000, 2000))))
@@ -0,0 +1,151 @@
+"""
+This is the pools module, it contains the EntityPools a level builds its weapons, enemies, blocks and floor from, so
+loading another level or load-out reshapes the sprites, bodies and shapes of the last one instead of creating new ones
+"""
+from collections import deque
+from sprites import Floor, Block, CannonBall, Enemy
+
+# How many sprites of each kind are kept for reuse, a level that needs more creates the rest
+POOL_SIZES = {
+    'weapons': 8,
+    'enemies': 16,
+    'dynamic_blocks': 64,
+    'static_blocks': 32,
+    'floors': 2,
+}
+
+
+class Pool:
+    """
+    The released sprites of one kind waiting to be reused, counting how often a sprite could be reused (a hit) and how
+    often one had to be created (a miss)
+    """
+
+    def __init__(self, size):
+        """
+        Parameters
+        ----------
+        size : The most sprites kept, any released while the pool is full are left to the garbage collector
+        """
+        self.size = size
+        self.free = deque()
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self):
+        """
+        Returns
+        -------
+        The sprite released longest ago, to be reset, or None if there is none and one has to be created
+        """
+        if self.free:
+            self.hits += 1
+            return self.free.popleft()
+        self.misses += 1
+        return None
+
+    def release(self, sprite):
+        """
+        Parameters
+        ----------
+        sprite : A sprite that is no longer in any space
+        """
+        if len(self.free) < self.size:
+            self.free.append(sprite)
+
+    def __repr__(self):
+        return f'Pool(size={self.size}, free={len(self.free)}, hits={self.hits}, misses={self.misses})'
+
+
+class EntityPools:
+    """
+    Creates the sprites of a level, reusing those of the last level released to it. A reused sprite is reshaped and
+    put at rest exactly as a new one would be, so a level plays out the same whichever it was built from
+    """
+
+    def __init__(self, sizes=None):
+        """
+        Parameters
+        ----------
+        sizes : A dictionary of the names in POOL_SIZES to how many of that kind are kept, POOL_SIZES for any not given
+        """
+        self.pools = {name: Pool(size) for name, size in {**POOL_SIZES, **(sizes or {})}.items()}
+
+    def weapon(self, display, pos, radius, space, mass, friction, elasticity):
+        """
+        Returns
+        -------
+        A CannonBall with the arguments of CannonBall, added to space
+        """
+        weapon = self.pools['weapons'].acquire()
+        if weapon is None:
+            return CannonBall(display, pos, radius, space, mass, friction, elasticity)
+        weapon.reset(pos, radius, space, mass, friction, elasticity)
+        return weapon
+
+    def enemy(self, display, pos, size, space):
+        """
+        Returns
+        -------
+        An Enemy with the arguments of Enemy, added to space
+        """
+        enemy = self.pools['enemies'].acquire()
+        if enemy is None:
+            return Enemy(display, pos, size, space)
+        enemy.reset(pos, size, space)
+        return enemy
+
+    def block(self, game, pos, size, body, angle, space):
+        """
+        Returns
+        -------
+        A Block with the arguments of Block, added to space. Static and dynamic blocks are pooled apart as their bodies
+        and textures differ
+        """
+        block = self.pools[f'{body}_blocks'].acquire()
+        if block is None:
+            return Block(game, pos, size, body, angle, space)
+        block.reset(pos, size, angle, space)
+        return block
+
+    def floor(self, display, start, end, space):
+        """
+        Returns
+        -------
+        A Floor with the arguments of Floor, added to space
+        """
+        floor = self.pools['floors'].acquire()
+        if floor is None:
+            return Floor(display, start, end, space)
+        floor.reset(start, end, space)
+        return floor
+
+    def release(self, *sprites):
+        """
+        Parameters
+        ----------
+        sprites : Sprites made by the pools whose bodies have been taken out of their space, in the order they are to
+            be reused in
+        """
+        for sprite in sprites:
+            sprite.kill()
+            if isinstance(sprite, CannonBall):
+                name = 'weapons'
+            elif isinstance(sprite, Enemy):
+                name = 'enemies'
+            elif isinstance(sprite, Block):
+                name = 'static_blocks' if sprite.is_static else 'dynamic_blocks'
+            else:
+                name = 'floors'
+            self.pools[name].release(sprite)
+
+    def stats(self):
+        """
+        Returns
+        -------
+        A dictionary of each pool's name and its hits and misses
+        """
+        return {name: (pool.hits, pool.misses) for name, pool in self.pools.items()}
+
+    def __repr__(self):
+        return 'EntityPools(' + ', '.join(f'{name}={pool!r}' for name, pool in self.pools.items()) + ')'
@@ -0,0 +1,208 @@
+"""
+This is the profiler module, it contains the FrameProfiler which times each phase of every frame of the menus and levels,
+shows rolling percentiles in an overlay and writes every frame it timed to a CSV file on exit
+"""
+import csv
+import time
+from collections import deque
+from functools import partial
+import pygame as pg
+from resources import fonts
+
+# The phases of a frame in the order they happen, wait is the time spent in clock.tick holding the frame rate
+PHASES = ('events', 'physics', 'draw', 'display', 'wait')
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered, p):
+    """
+    Parameters
+    ----------
+    ordered : A sorted list of timings
+    p : The percentile, from 0-100
+
+    Returns
+    -------
+    The nearest-rank percentile of the timings, 0 if there are none
+    """
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame between begin_frame() and end_frame(). While it is disabled every call returns
+    straight away, so it can be left in the frame loops
+    """
+
+    def __init__(self, game, enabled=False, window=600, max_records=200000, csv_path='frame_profile.csv',
+                 toggle_key=pg.K_F3):
+        """
+        Parameters
+        ----------
+        game : The instance of the Game class providing access to its attributes and methods
+        enabled : Whether frames are timed and the overlay is shown from the start
+        window : How many of the latest frames the percentiles are worked out from
+        max_records : How many frames are kept for the CSV file, the oldest are dropped first
+        csv_path : Where the frames are written on exit, or None to not write them
+        toggle_key : The key that turns the profiler and its overlay on and off
+        """
+        self.game = game
+        self.enabled = enabled
+        self.csv_path = csv_path
+        self.toggle_key = toggle_key
+        self.windows = {phase: deque(maxlen=window) for phase in PHASES + ('total',)}
+        self.records = deque(maxlen=max_records)
+        self.frame = 0
+        self.state = None
+        # The phase timings of the frame in progress, None between frames and whenever the profiler is disabled
+        self.current = None
+        # What the frame in progress counted, such as the physics substeps it took, and what the last frame counted
+        self.counts = {}
+        self.last_counts = {}
+        self.start = 0
+        self.last = 0
+        # The rendered overlay lines, kept apart from the shared text cache as the numbers change every refresh
+        self.lines = []
+        self.overlay_text = ()
+        self.overlay_time = 0
+
+    def toggle(self):
+        """
+        Turns the profiler and its overlay on or off, the frame in progress is not timed
+        """
+        self.enabled = not self.enabled
+        self.current = None
+
+    def handle_event(self, event):
+        """
+        Parameters
+        ----------
+        event : An event pulled by a menu or level
+        """
+        if event.type == pg.KEYDOWN and event.key == self.toggle_key:
+            self.toggle()
+
+    def begin_frame(self, state):
+        """
+        Parameters
+        ----------
+        state : The name of the menu or level the frame belongs to
+        """
+        if not self.enabled:
+            return
+        self.state = state
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.counts = {}
+        self.start = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        """
+        Parameters
+        ----------
+        phase : The phase that just finished, the time since the previous mark is added to it
+        """
+        if self.current is None:
+            return
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def count(self, name, amount=1):
+        """
+        Parameters
+        ----------
+        name : What is being counted, shown by that name in the overlay
+        amount : How many to add to the count of the frame in progress
+        """
+        if self.current is None:
+            return
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def end_frame(self):
+        """
+        Adds the finished frame to the rolling windows and the records written to the CSV file
+        """
+        if self.current is None:
+            return
+        current, self.current = self.current, None
+        self.last_counts = self.counts
+        total = self.last - self.start
+        for phase, seconds in current.items():
+            self.windows[phase].append(seconds * 1000)
+        self.windows['total'].append(total * 1000)
+        self.frame += 1
+        self.records.append((self.frame, self.state, self.start, *(current[phase] * 1000 for phase in PHASES),
+                             total * 1000))
+
+    def percentiles(self):
+        """
+        Returns
+        -------
+        A dictionary of each phase, and the frame total, and its p50, p95 and p99 in milliseconds
+        """
+        result = {}
+        for phase, window in self.windows.items():
+            ordered = sorted(window)
+            result[phase] = tuple(percentile(ordered, p) for p in PERCENTILES)
+        return result
+
+    def overlay(self, refresh=0.25):
+        """
+        Parameters
+        ----------
+        refresh : Seconds between updates of the numbers, so they can be read and are not worked out every frame
+
+        Returns
+        -------
+        The (component, key, draw) tuples of the overlay for the DirtyRectRenderer, empty while disabled
+        """
+        if not self.enabled:
+            return []
+        now = time.perf_counter()
+        if now - self.overlay_time >= refresh:
+            self.overlay_time = now
+            lines = ['phase   p50 / p95 / p99 ms']
+            for phase, values in self.percentiles().items():
+                lines.append(f'{phase:<8}' + ' / '.join(f'{value:.2f}' for value in values))
+            for name, value in self.last_counts.items():
+                lines.append(f'{name} {value} last frame')
+            if tuple(lines) != self.overlay_text:
+                font = fonts.get(18)
+                # Only the lines whose text changed are rendered again
+                self.lines = [self.lines[i] if self.overlay_text[i:i + 1] == (line,)
+                              else font.render(line, False, 'white') for i, line in enumerate(lines)]
+                self.overlay_text = tuple(lines)
+        return [(('profiler', i), line, partial(self.draw_line, surface, i))
+                for i, (surface, line) in enumerate(zip(self.lines, self.overlay_text))]
+
+    def draw_line(self, surface, row):
+        """
+        Parameters
+        ----------
+        surface : The rendered line
+        row : The number of the line from the top of the overlay
+
+        Returns
+        -------
+        The area of the screen that was drawn over
+        """
+        return self.game.display.blit(surface, surface.get_rect(center=(1135, 20 + row * 20)))
+
+    def export(self):
+        """
+        Returns
+        -------
+        The path the frames were written to, or None if there was nothing to write
+
+        Writes every recorded frame to the CSV file, one row per frame
+        """
+        if self.csv_path is None or not self.records:
+            return None
+        with open(self.csv_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('frame', 'state', 'time') + tuple(f'{phase}_ms' for phase in PHASES) + ('total_ms',))
+            for frame, state, start, *timings in self.records:
+                writer.writerow((frame, state, f'{start:.6f}', *(f'{value:.4f}' for value in timings)))
+        return self.csv_path
@@ -0,0 +1,187 @@
+"""
+This is the recording module, it contains the Recording which holds the inputs of one attempt at a level, the physics
+step each was pressed on and how many steps every frame took, in a small compressed file
+"""
+import os
+import struct
+import time
+import zlib
+from array import array
+import pygame as pg
+from level_data import level_library
+from resources import ASSETS_DIR
+
+MAGIC = b'PMRC'
+VERSION = 1
+# The keys a level reacts to, stored in a file as their index in this tuple
+KEYS = (pg.K_SPACE, pg.K_d, pg.K_a, pg.K_w, pg.K_s)
+HEADER = struct.Struct('<4sBHBHHHBIII')
+INPUT = struct.Struct('<IBHH')
+# Recordings are kept next to the assets folder, not in it, as they are not part of the game
+RECORDINGS_DIR = os.path.join(os.path.dirname(ASSETS_DIR), 'recordings')
+
+
+class RecordingError(ValueError):
+    """
+    Raised when a file is not a recording this version of the game can read
+    """
+
+
+def level_signature(level_pointer):
+    """
+    Parameters
+    ----------
+    level_pointer : The number of the level
+
+    Returns
+    -------
+    A checksum of the compiled level, which changes whenever the level file is edited
+    """
+    return zlib.crc32(repr(level_library.get(level_pointer)).encode())
+
+
+class Recording:
+    """
+    The inputs of one attempt at a level. Every physics step is fixed, so replaying each input on the step it was
+    pressed on reproduces the attempt exactly
+    """
+
+    def __init__(self, level_pointer, class_choice, physics_rate, shot_power=0, shot_angle=0, signature=None):
+        """
+        Parameters
+        ----------
+        level_pointer : The number of the level played
+        class_choice : The number of the load-out played
+        physics_rate : How many physics steps a second the level ran at
+        shot_power : The power the attempt started with
+        shot_angle : The angle the attempt started with
+        signature : The checksum of the level when it was recorded, worked out from the level if not given
+        """
+        self.level_pointer = level_pointer
+        self.class_choice = class_choice
+        self.physics_rate = physics_rate
+        self.shot_power = shot_power
+        self.shot_angle = shot_angle
+        self.signature = level_signature(level_pointer) if signature is None else signature
+        # How many physics steps each frame took, which is all a replay needs to keep the recorded pace
+        self.frames = array('B')
+        # Tuples of (step, key, shot_power, shot_angle) in the order they were pressed
+        self.inputs = []
+        self.steps = 0
+        self.outcome = 3
+
+    @classmethod
+    def for_level(cls, level):
+        """
+        Parameters
+        ----------
+        level : The Level about to be played
+
+        Returns
+        -------
+        An empty recording of the level
+        """
+        return cls(level.game.level_pointer, level.game.class_choice, level.game.physics_rate,
+                   level.shot_power, level.shot_angle)
+
+    def add_frame(self, steps):
+        """
+        Parameters
+        ----------
+        steps : How many physics steps the frame took
+        """
+        self.frames.append(min(steps, 255))
+        self.steps += steps
+
+    def add_key(self, key, shot_power, shot_angle):
+        """
+        Parameters
+        ----------
+        key : The key pressed, keys a level does not react to are ignored
+        shot_power : The power when it was pressed
+        shot_angle : The angle when it was pressed
+        """
+        if key in KEYS:
+            self.inputs.append((self.steps, key, shot_power, shot_angle))
+
+    def to_bytes(self):
+        """
+        Returns
+        -------
+        The recording in its file format, a header followed by the compressed frames and inputs
+        """
+        body = self.frames.tobytes() + b''.join(INPUT.pack(step, KEYS.index(key), power, angle)
+                                                for step, key, power, angle in self.inputs)
+        header = HEADER.pack(MAGIC, VERSION, self.level_pointer, self.class_choice, self.physics_rate,
+                             self.shot_power, self.shot_angle, self.outcome, self.signature, len(self.frames),
+                             len(self.inputs))
+        return header + zlib.compress(body, 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Parameters
+        ----------
+        data : The contents of a recording file
+
+        Returns
+        -------
+        The recording
+        """
+        try:
+            magic, version, level_pointer, class_choice, physics_rate, shot_power, shot_angle, outcome, signature, \
+                frame_count, input_count = HEADER.unpack_from(data)
+            body = zlib.decompress(data[HEADER.size:])
+        except (struct.error, zlib.error) as error:
+            raise RecordingError(f'Not a recording: {error}') from error
+        if magic != MAGIC or version != VERSION:
+            raise RecordingError(f'Not a version {VERSION} recording')
+        if len(body) != frame_count + input_count * INPUT.size:
+            raise RecordingError('The recording is truncated')
+        recording = cls(level_pointer, class_choice, physics_rate, shot_power, shot_angle, signature)
+        recording.outcome = outcome
+        recording.frames.frombytes(body[:frame_count])
+        recording.steps = sum(recording.frames)
+        for i in range(input_count):
+            step, key, power, angle = INPUT.unpack_from(body, frame_count + i * INPUT.size)
+            recording.inputs.append((step, KEYS[key], power, angle))
+        return recording
+
+    def save(self, path=None, directory=RECORDINGS_DIR):
+        """
+        Parameters
+        ----------
+        path : Where the recording is written, a new file in directory if not given
+        directory : The folder a new recording file is made in
+
+        Returns
+        -------
+        The path it was written to
+        """
+        if path is None:
+            os.makedirs(directory, exist_ok=True)
+            name = f'level{self.level_pointer}_class{self.class_choice}_{time.strftime("%Y%m%d-%H%M%S")}.pmr'
+            path = os.path.join(directory, name)
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(self.to_bytes())
+        os.replace(temporary_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """
+        Parameters
+        ----------
+        path : The recording file
+
+        Returns
+        -------
+        The recording read from it
+        """
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+    def __repr__(self):
+        return (f'Recording(level={self.level_pointer}, class={self.class_choice}, frames={len(self.frames)}, '
+                f'steps={self.steps}, inputs={len(self.inputs)}, outcome={self.outcome})')
@@ -0,0 +1,222 @@
+"""
+This is the render module, it contains the DirtyRectRenderer which only pushes the parts of the screen that changed and
+the PolygonBatch which moves the corners of every moving polygon in one NumPy operation
+"""
+from functools import partial
+import numpy as np
+import pygame as pg
+import pymunk.batch
+
+POSE_FIELDS = pymunk.batch.BodyFields.BODY_ID | pymunk.batch.BodyFields.POSITION | pymunk.batch.BodyFields.ANGLE
+
+
+class DirtyRectRenderer:
+    """
+    Redraws only the components whose appearance changed and updates only those areas of the window
+    """
+
+    def __init__(self, display, enabled=True, profiler=None):
+        """
+        Parameters
+        ----------
+        display : The screen being drawn to
+        enabled : When False every frame is drawn and pushed in full, as if nothing was cached
+        profiler : The FrameProfiler told when drawing ends and pushing to the window begins, if any
+        """
+        self.display = display
+        self.enabled = enabled
+        self.profiler = profiler
+        self.background = None
+        # Maps each drawn component to the key it was drawn with and the area of the screen it covered
+        self.drawn = {}
+        self.full_refresh = True
+
+    def refresh(self):
+        """
+        Forces the next frame to be drawn and pushed in full, used when something else has drawn over the screen
+        """
+        self.full_refresh = True
+
+    def set_background(self, background):
+        """
+        Parameters
+        ----------
+        background : The surface the components are drawn over, the same size as the screen
+
+        A full refresh only happens when the background changes
+        """
+        if background is not self.background:
+            self.background = background
+            self.full_refresh = True
+
+    def render(self, components):
+        """
+        Parameters
+        ----------
+        components : A list of (component, key, draw) tuples in drawing order. key changes whenever the component
+            would be drawn differently and draw() draws it, returning the area of the screen it covered
+
+        Returns
+        -------
+        The list of areas of the screen that were updated
+        """
+        if self.full_refresh or not self.enabled:
+            self.display.blit(self.background, (0, 0))
+            self.drawn = {component: (key, draw()) for component, key, draw in components}
+            if self.profiler is not None:
+                self.profiler.mark('draw')
+            pg.display.update()
+            self.full_refresh = False
+            return [self.display.get_rect()]
+
+        dirty = []
+        changed = set()
+        for component, key, draw in components:
+            previous = self.drawn.get(component)
+            if previous is None or previous[0] != key:
+                changed.add(component)
+                if previous is not None:
+                    dirty.append(previous[1])
+        # Components that are no longer drawn leave behind an area that has to be cleared
+        present = {component for component, key, draw in components}
+        for component in [component for component in self.drawn if component not in present]:
+            dirty.append(self.drawn.pop(component)[1])
+        if not changed and not dirty:
+            if self.profiler is not None:
+                self.profiler.mark('draw')
+            return []
+
+        for rect in dirty:
+            self.display.blit(self.background, rect, rect)
+        # Components are redrawn in order if they changed or overlap a cleared area, so overlaps stay layered correctly
+        for component, key, draw in components:
+            if component in changed or self.drawn[component][1].collidelist(dirty) != -1:
+                rect = draw()
+                self.drawn[component] = (key, rect)
+                dirty.append(rect)
+        if self.profiler is not None:
+            self.profiler.mark('draw')
+        pg.display.update(dirty)
+        return dirty
+
+
+class PolygonBatch:
+    """
+    Keeps the local corners of every moving Block and Enemy in one array, so each frame all of them are rotated and
+    moved into place at once instead of one corner at a time
+    """
+
+    def __init__(self):
+        self.sprites = []
+        self.bodies = []
+        # The id of each body, to find it among the bodies of its space
+        self.ids = np.empty(0, dtype=np.uintp)
+        self.buffer = pymunk.batch.Buffer()
+        # The index of each sprite and where its corners start and end in the arrays below
+        self.slices = {}
+        self.local = np.empty((0, 2))
+        # The index of the sprite each corner belongs to
+        self.owner = np.empty(0, dtype=np.intp)
+        self.previous = np.empty((0, 3))
+        # The interpolated x, y and angle of every body from the last transform
+        self.drawn = np.empty((0, 3))
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def add(self, *sprites):
+        """
+        Parameters
+        ----------
+        sprites : Sprites with a body and a list of corners around the body's centre, such as Block and Enemy
+        """
+        local = [self.local]
+        owner = [self.owner]
+        start = len(self.local)
+        for sprite in sprites:
+            corners = np.array([tuple(corner) for corner in sprite.corners], dtype=float)
+            self.slices[sprite] = (len(self.sprites), slice(start, start + len(corners)))
+            start += len(corners)
+            local.append(corners)
+            owner.append(np.full(len(corners), len(self.sprites), dtype=np.intp))
+            self.sprites.append(sprite)
+            self.bodies.append(sprite.body)
+        self.local = np.concatenate(local)
+        self.owner = np.concatenate(owner)
+        self.ids = np.array([body.id for body in self.bodies], dtype=np.uintp)
+        self.save_states()
+
+    def poses(self):
+        """
+        Returns
+        -------
+        An array of the x, y and angle of every body
+
+        Every body of the space is read in one call and those of the batch picked out by id, the few that are no
+        longer in the space, such as destroyed enemies, are read one at a time
+        """
+        space = next((body.space for body in self.bodies if body.space is not None), None)
+        if space is None:
+            return np.array([(*body.position, body.angle) for body in self.bodies], dtype=float).reshape(-1, 3)
+        self.buffer.clear()
+        pymunk.batch.get_space_bodies(space, POSE_FIELDS, self.buffer)
+        ids = np.frombuffer(self.buffer.int_buf(), dtype=np.uintp)
+        values = np.frombuffer(self.buffer.float_buf(), dtype=float).reshape(-1, 3)
+        # The space lists sleeping bodies after the awake ones, so the order changes between frames
+        order = np.argsort(ids)
+        rows = order[np.searchsorted(ids, self.ids, sorter=order).clip(max=len(ids) - 1)]
+        poses = values[rows]
+        for index in np.flatnonzero(ids[rows] != self.ids):
+            body = self.bodies[index]
+            poses[index] = (*body.position, body.angle)
+        return poses
+
+    def save_states(self):
+        """
+        Remembers where every body was before the next physics step so frames can be interpolated
+        """
+        self.previous = self.poses()
+
+    def transform(self, alpha=1):
+        """
+        Parameters
+        ----------
+        alpha : How far, from 0-1, the frame is between the previous physics step and the current one
+
+        Returns
+        -------
+        An array of the screen coordinates of every corner, rounded to whole pixels like pygame_util.to_pygame
+        """
+        poses = self.poses()
+        if alpha < 1:
+            poses = self.previous + (poses - self.previous) * alpha
+        self.drawn = poses
+        poses = poses[self.owner]
+        cos, sin = np.cos(poses[:, 2]), np.sin(poses[:, 2])
+        x, y = self.local[:, 0], self.local[:, 1]
+        points = np.empty_like(self.local)
+        points[:, 0] = x * cos - y * sin + poses[:, 0]
+        points[:, 1] = x * sin + y * cos + poses[:, 1]
+        return np.rint(points).astype(np.int32)
+
+    def components(self, points, sprites):
+        """
+        Parameters
+        ----------
+        points : The corners returned by transform()
+        sprites : The sprites to draw, in drawing order, each of which was added to the batch
+
+        Returns
+        -------
+        The (component, key, draw) tuples of the sprites for the DirtyRectRenderer, a sprite is only drawn again when
+        its draw_key changes
+        """
+        components = []
+        poses = self.drawn.tolist()
+        for sprite in sprites:
+            index, corners = self.slices[sprite]
+            corners = points[corners]
+            pose = poses[index]
+            components.append((sprite, sprite.draw_key(corners, pose),
+                               partial(sprite.draw, points=corners.tolist(), pose=pose)))
+        return components
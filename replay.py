@@ -0,0 +1,157 @@
+"""
+This is the replay module, it plays recordings of levels back, either in the window at the pace they were recorded at or
+headless as fast as the physics allows, and checks they end the way they did when recorded
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import deque
+import pygame as pg
+from recording import Recording, RecordingError, RECORDINGS_DIR, level_signature
+from simulation import build_level, SimulationResult
+
+
+def apply_inputs(level, inputs):
+    """
+    Parameters
+    ----------
+    level : The Level being replayed
+    inputs : A deque of the recorded (step, key, shot_power, shot_angle) inputs still to come
+
+    Presses every key recorded on the level's current step. A launch uses the power and angle it was recorded with
+    """
+    while inputs and inputs[0][0] <= level.steps and level.status() == 3:
+        step, key, shot_power, shot_angle = inputs.popleft()
+        if key == pg.K_SPACE:
+            level.shot_power, level.shot_angle = shot_power, shot_angle
+        level.handle_key(key)
+
+
+def replay_headless(recording):
+    """
+    Parameters
+    ----------
+    recording : The Recording to replay
+
+    Returns
+    -------
+    A SimulationResult of the replayed attempt
+
+    Steps the physics as fast as the CPU allows, stopping when the level is won or lost or the recorded steps run out
+    """
+    start = time.perf_counter()
+    level = build_level(recording.level_pointer, recording.class_choice)
+    level.shot_power, level.shot_angle = recording.shot_power, recording.shot_angle
+    dt = 1 / recording.physics_rate
+    inputs = deque(recording.inputs)
+    while level.steps < recording.steps and level.status() == 3:
+        apply_inputs(level, inputs)
+        level.step(dt)
+    result = SimulationResult(level)
+    result.wall_time = time.perf_counter() - start
+    return result
+
+
+def replay(game, recording):
+    """
+    Parameters
+    ----------
+    game : The instance of the Game class the level is drawn with
+    recording : The Recording to replay
+
+    Returns
+    -------
+    The state of the level when the replay ended, as returned by Level.status()
+
+    Draws every recorded frame after pressing its keys and taking the physics steps it took when recorded, at the
+    game's frame rate
+    """
+    game.level_pointer, game.class_choice = recording.level_pointer, recording.class_choice
+    level = game.states[5]
+    level.restart()
+    level.shot_power, level.shot_angle = recording.shot_power, recording.shot_angle
+    dt = 1 / recording.physics_rate
+    inputs = deque(recording.inputs)
+    for steps in recording.frames:
+        for event in pg.event.get():
+            if event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
+                return level.status()
+        apply_inputs(level, inputs)
+        for _ in range(steps):
+            level.save_states()
+            level.step(dt)
+        if level.status() != 3:
+            break
+        if level.static_layer is None:
+            level.build_static_layer()
+        level.renderer.set_background(level.static_layer)
+        level.renderer.render(level.components(1))
+        game.clock.tick(game.frame_rate)
+    return level.status()
+
+
+def check(paths):
+    """
+    Parameters
+    ----------
+    paths : The recording files to replay
+
+    Returns
+    -------
+    The lines of a report of each recording and whether its replay ended the way it was recorded, and how many did not
+    """
+    lines = []
+    mismatches = 0
+    names = {1: 'won', 2: 'lost', 3: 'unfinished'}
+    for path in paths:
+        try:
+            recording = Recording.load(path)
+        except (OSError, RecordingError) as error:
+            lines.append(f'{path}: {error}')
+            mismatches += 1
+            continue
+        result = replay_headless(recording)
+        matches = result.status == recording.outcome
+        mismatches += not matches
+        note = '' if recording.signature == level_signature(recording.level_pointer) else ', level changed since'
+        lines.append(f'{os.path.basename(path)}: recorded {names[recording.outcome]}, replayed '
+                     f'{names[result.status]} in {result.steps} steps, {result.wall_time * 1000:.0f} ms'
+                     f'{"" if matches else "  MISMATCH"}{note}')
+    return lines, mismatches
+
+
+def main(argv=None):
+    """
+    Parameters
+    ----------
+    argv : The command line arguments, sys.argv if not given
+
+    Returns
+    -------
+    The exit status, 1 if any replay ended differently to its recording
+    """
+    parser = argparse.ArgumentParser(description='Replays recorded attempts at levels')
+    parser.add_argument('paths', nargs='*', help='recording files, every recording in the recordings folder if none')
+    parser.add_argument('--watch', action='store_true', help='play the recordings in the window at their recorded pace')
+    args = parser.parse_args(argv)
+    paths = args.paths or sorted(glob.glob(os.path.join(RECORDINGS_DIR, '*.pmr')))
+    if not args.watch:
+        lines, mismatches = check(paths)
+        print('\n'.join(lines))
+        return 1 if mismatches else 0
+
+    from main import Game
+    pg.init()
+    game = Game()
+    try:
+        for path in paths:
+            print(path, replay(game, Recording.load(path)))
+    finally:
+        pg.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""
+This is the resources module, it contains the asset manager and the caches shared by every menu and level so assets
+are only loaded and scaled once
+"""
+from collections import OrderedDict
+import os
+import time
+import pygame as pg
+
+# The assets folder is resolved once, every asset path is built from it
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "assets")
+
+
+def asset_path(*parts):
+    """
+    Parameters
+    ----------
+    parts : The folders and file name of the asset inside the assets folder
+
+    Returns
+    -------
+    The full path of the asset
+    """
+    return os.path.join(ASSETS_DIR, *parts)
+
+
+def surface_bytes(surface):
+    """
+    Parameters
+    ----------
+    surface : A pygame surface
+
+    Returns
+    -------
+    The number of bytes used by the pixels of the surface
+    """
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class ScaledSurfaceCache:
+    """
+    Keeps scaled copies of surfaces, evicting the least recently used copy once it is full
+    """
+
+    def __init__(self, max_entries=64, max_bytes=None):
+        """
+        Parameters
+        ----------
+        max_entries : The most scaled surfaces kept at once
+        max_bytes : The most pixel memory the scaled surfaces may use at once, or None for no limit
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source, size):
+        """
+        Parameters
+        ----------
+        source : The original surface, it is always scaled from so quality is never lost to repeated resampling
+        size : Width and Height of the scaled surface
+
+        Returns
+        -------
+        The scaled surface, which is shared and must not be drawn onto
+        """
+        key = (source, (int(size[0]), int(size[1])))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = pg.transform.scale(source, key[1])
+        self.surfaces[key] = surface
+        self.bytes += surface_bytes(surface)
+        # The surface just added is never evicted, even when it is bigger than max_bytes on its own
+        while len(self.surfaces) > 1 and (len(self.surfaces) > self.max_entries or
+                                          (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            self.bytes -= surface_bytes(self.surfaces.popitem(last=False)[1])
+        return surface
+
+    def clear(self):
+        """
+        Empties the cache
+        """
+        self.surfaces.clear()
+        self.bytes = 0
+
+
+# Shared by every component so equal sized widgets use the same surface
+scaled_surfaces = ScaledSurfaceCache()
+
+
+class RotatedSurfaceCache:
+    """
+    Keeps rotated copies of scaled surfaces at angles rounded to a step, evicting the least recently used copy once it
+    is full
+    """
+
+    def __init__(self, scaled, step=2, max_entries=1024, max_bytes=32 * 1024 * 1024):
+        """
+        Parameters
+        ----------
+        scaled : The ScaledSurfaceCache the surfaces are scaled with before they are rotated
+        step : The angles are rounded to a multiple of this many degrees, so nearby angles share one surface
+        max_entries : The most rotated surfaces kept at once
+        max_bytes : The most pixel memory the rotated surfaces may use at once
+        """
+        self.scaled = scaled
+        self.step = step
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, angle):
+        """
+        Parameters
+        ----------
+        angle : An angle in degrees
+
+        Returns
+        -------
+        The angle rounded to the nearest step, from 0 up to 360
+        """
+        return round(angle / self.step) * self.step % 360
+
+    def get(self, source, size, angle):
+        """
+        Parameters
+        ----------
+        source : The original surface
+        size : Width and Height it is scaled to before rotating
+        angle : The angle in degrees it is rotated anticlockwise by, as in pg.transform.rotate
+
+        Returns
+        -------
+        The scaled and rotated surface, which is shared and must not be drawn onto
+        """
+        key = (source, (int(size[0]), int(size[1])), self.quantize(angle))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.scaled.get(source, key[1])
+        # The corners uncovered by rotating are only transparent if the surface has per pixel alpha
+        if not surface.get_flags() & pg.SRCALPHA and pg.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        surface = pg.transform.rotate(surface, key[2])
+        self.surfaces[key] = surface
+        self.bytes += surface_bytes(surface)
+        while len(self.surfaces) > 1 and (len(self.surfaces) > self.max_entries or self.bytes > self.max_bytes):
+            self.bytes -= surface_bytes(self.surfaces.popitem(last=False)[1])
+        return surface
+
+    def clear(self):
+        """
+        Empties the cache
+        """
+        self.surfaces.clear()
+        self.bytes = 0
+
+
+# Shared by every textured block so blocks of the same size and texture share their rotated copies
+rotated_surfaces = RotatedSurfaceCache(scaled_surfaces)
+
+
+class AssetManager:
+    """
+    Loads images the first time they are used, converts them to the pixel format of the screen and keeps the scaled
+    variants that are used in a memory bounded cache
+    """
+
+    def __init__(self, paths, max_scaled_bytes=64 * 1024 * 1024):
+        """
+        Parameters
+        ----------
+        paths : A dictionary of image names and the paths they are loaded from
+        max_scaled_bytes : The most pixel memory the scaled variants may use at once
+        """
+        self.paths = paths
+        self.images = {}
+        self.load_times = {}
+        self.scaled_images = ScaledSurfaceCache(max_bytes=max_scaled_bytes)
+
+    def __getitem__(self, name):
+        """
+        Parameters
+        ----------
+        name : The name of the image
+
+        Returns
+        -------
+        The image, loaded and converted if this is the first time it is used
+        """
+        image = self.images.get(name)
+        if image is None:
+            image = self.load(name)
+        return image
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def load(self, name):
+        """
+        Parameters
+        ----------
+        name : The name of the image
+
+        Returns
+        -------
+        The image converted to the pixel format of the screen, so it does not have to be converted on every blit
+        """
+        start = time.perf_counter()
+        image = pg.image.load(self.paths[name])
+        # Converting needs a screen to convert to, which headless runs do not have
+        if pg.display.get_surface() is not None:
+            image = image.convert_alpha() if image.get_alpha() is not None else image.convert()
+        self.load_times[name] = time.perf_counter() - start
+        self.images[name] = image
+        return image
+
+    def scaled(self, name, size):
+        """
+        Parameters
+        ----------
+        name : The name of the image
+        size : Width and Height of the scaled image
+
+        Returns
+        -------
+        The image scaled to size, which is shared and must not be drawn onto
+        """
+        return self.scaled_images.get(self[name], size)
+
+    def memory_used(self):
+        """
+        Returns
+        -------
+        The number of bytes used by the loaded images and their scaled variants
+        """
+        return sum(surface_bytes(image) for image in self.images.values()) + self.scaled_images.bytes
+
+    def report(self):
+        """
+        Returns
+        -------
+        A line for every loaded image with how long it took to load and how much memory it uses
+        """
+        lines = []
+        for name, image in self.images.items():
+            lines.append(f'{name}: {image.get_width()}x{image.get_height()} loaded in '
+                         f'{self.load_times[name] * 1000:.1f} ms, {surface_bytes(image) / 1024:.0f} KiB')
+        lines.append(f'scaled variants: {len(self.scaled_images.surfaces)}, '
+                     f'{self.scaled_images.bytes / 1024:.0f} KiB')
+        lines.append(f'total: {self.memory_used() / 1024:.0f} KiB')
+        return lines
+
+
+# The font used by every Label and Button
+DEFAULT_FONT = asset_path("fonts", "BungeeSpice-Regular.ttf")
+
+
+class FontCache:
+    """
+    Opens every font file once per size, shared by the whole game
+    """
+
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, size, path=DEFAULT_FONT):
+        """
+        Parameters
+        ----------
+        size : The size of the font
+        path : The path of the font file
+
+        Returns
+        -------
+        The font, which is only read from disk the first time it is asked for
+        """
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pg.font.Font(path, size)
+            self.fonts[key] = font
+        return font
+
+
+class TextCache:
+    """
+    Keeps rendered text surfaces, evicting the least recently used surface once it is full
+    """
+
+    def __init__(self, fonts, max_entries=256):
+        """
+        Parameters
+        ----------
+        fonts : The FontCache the text is rendered with
+        max_entries : The most text surfaces kept at once
+        """
+        self.fonts = fonts
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, text, size, colour, path=DEFAULT_FONT):
+        """
+        Parameters
+        ----------
+        text : The text to render
+        size : The size of the font
+        colour : The colour of the text
+        path : The path of the font file
+
+        Returns
+        -------
+        The rendered text, which is shared and must not be drawn onto
+        """
+        key = (text, size, colour, path)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = self.fonts.get(size, path).render(text, False, colour)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+# Shared by every Label and Button so building a menu or restarting a level does not touch the font files
+fonts = FontCache()
+text_surfaces = TextCache(fonts)
@@ -0,0 +1,396 @@
+"""
+This is the save module, it contains the SaveGame which holds the progress and settings kept between sessions, the
+Checkpoint which holds an attempt at a level part way through, and the SaveWriter which writes them to disk on a
+background thread
+"""
+import os
+import struct
+import threading
+import zlib
+import pymunk as pm
+from recording import level_signature
+from resources import ASSETS_DIR
+
+MAGIC = b'PMSV'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBHB')
+CHECKPOINT = struct.Struct('<HBIIHHHHH')
+# The x, y, angle, x velocity, y velocity and angular velocity of a body
+BODY = struct.Struct('<6d')
+# Whether the weapon is still loaded or in flight, whether it was launched and how long it has been in play
+WEAPON = struct.Struct('<BBd')
+# Saves are kept next to the assets folder, not in it, as they are not part of the game
+SAVES_DIR = os.path.join(os.path.dirname(ASSETS_DIR), 'saves')
+SAVE_PATH = os.path.join(SAVES_DIR, 'save.pms')
+
+
+class SaveError(ValueError):
+    """
+    Raised when a file is not a save this version of the game can read
+    """
+
+
+class Checkpoint:
+    """
+    An attempt at a level part way through: the state of every body the level was loaded with and which of its weapons
+    and enemies are left. Bodies are listed in the order of the level's LevelSnapshot, so a checkpoint is resumed by
+    restarting the level and moving each body back to where it was
+    """
+
+    def __init__(self, level_pointer, class_choice, signature, steps, shot_power, shot_angle, bodies, weapons,
+                 enemies):
+        """
+        Parameters
+        ----------
+        level_pointer : The number of the level
+        class_choice : The number of the load-out
+        signature : The checksum of the level when the checkpoint was taken
+        steps : How many physics steps the attempt had taken
+        shot_power : The power of the next shot
+        shot_angle : The angle of the next shot
+        bodies : A (x, y, angle, x velocity, y velocity, angular velocity) tuple for every body in the snapshot
+        weapons : A (left, is_shot, time_after_collision) tuple for every weapon in the snapshot
+        enemies : Whether each enemy in the snapshot is left
+        """
+        self.level_pointer = level_pointer
+        self.class_choice = class_choice
+        self.signature = signature
+        self.steps = steps
+        self.shot_power = shot_power
+        self.shot_angle = shot_angle
+        self.bodies = bodies
+        self.weapons = weapons
+        self.enemies = enemies
+
+    @classmethod
+    def from_level(cls, level):
+        """
+        Parameters
+        ----------
+        level : The Level being played
+
+        Returns
+        -------
+        A checkpoint of the attempt, or None if no attempt is in progress
+        """
+        snapshot = level.snapshot
+        if snapshot is None or not snapshot.matches(level) or level.steps == 0 or level.status() != 3:
+            return None
+        bodies = [(*body.position, body.angle, *body.velocity, body.angular_velocity) for body in snapshot.bodies]
+        weapons = [(weapon in level.weapons, weapon.is_shot, weapon.time_after_collision)
+                   for weapon in snapshot.weapons]
+        enemies = [enemy in level.enemies for enemy in snapshot.enemies]
+        return cls(snapshot.level_pointer, snapshot.class_choice, level_signature(snapshot.level_pointer),
+                   level.steps, level.shot_power, level.shot_angle, bodies, weapons, enemies)
+
+    def matches(self, level):
+        """
+        Parameters
+        ----------
+        level : The Level just restarted at the checkpoint's level and load-out
+
+        Returns
+        -------
+        True if the level has not been edited since the checkpoint was taken, so its bodies still line up
+        """
+        snapshot = level.snapshot
+        return (snapshot is not None and self.signature == level_signature(self.level_pointer)
+                and len(self.bodies) == len(snapshot.bodies) and len(self.weapons) == len(snapshot.weapons)
+                and len(self.enemies) == len(snapshot.enemies))
+
+    def apply(self, level):
+        """
+        Parameters
+        ----------
+        level : The Level just restarted at the checkpoint's level and load-out
+
+        Returns
+        -------
+        True if the attempt was resumed, False if the level changed since and was left at its start
+
+        Contacts between bodies are not saved, so the attempt carries on from the same positions and velocities but
+        may not play out exactly as it would have
+        """
+        if not self.matches(level):
+            return False
+        snapshot = level.snapshot
+        for body, (x, y, angle, vx, vy, angular_velocity) in zip(snapshot.bodies, self.bodies):
+            if body.body_type == pm.Body.DYNAMIC:
+                body.position = x, y
+                body.angle = angle
+                body.velocity = vx, vy
+                body.angular_velocity = angular_velocity
+        for weapon, (left, is_shot, time_after_collision) in zip(snapshot.weapons, self.weapons):
+            weapon.is_shot = bool(is_shot)
+            weapon.time_after_collision = time_after_collision
+            if not left:
+                weapon.remove()
+                level.collisions.unregister(weapon)
+                level.weapons.remove(weapon)
+        for enemy, left in zip(snapshot.enemies, self.enemies):
+            if not left:
+                level.space.remove(enemy.body, enemy.body_shape)
+                level.collisions.unregister(enemy)
+                level.enemies.remove(enemy)
+        level.steps = self.steps
+        level.shot_power = self.shot_power
+        level.shot_angle = self.shot_angle
+        level.save_states()
+        return True
+
+    def to_bytes(self):
+        """
+        Returns
+        -------
+        The checkpoint in its file format, a header followed by the bodies, weapons and enemies
+        """
+        header = CHECKPOINT.pack(self.level_pointer, self.class_choice, self.signature, self.steps, self.shot_power,
+                                 self.shot_angle, len(self.bodies), len(self.weapons), len(self.enemies))
+        return (header + b''.join(BODY.pack(*body) for body in self.bodies)
+                + b''.join(WEAPON.pack(*weapon) for weapon in self.weapons) + bytes(self.enemies))
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """
+        Parameters
+        ----------
+        data : The bytes the checkpoint is in
+        offset : Where in data the checkpoint starts
+
+        Returns
+        -------
+        The checkpoint
+        """
+        level_pointer, class_choice, signature, steps, shot_power, shot_angle, body_count, weapon_count, \
+            enemy_count = CHECKPOINT.unpack_from(data, offset)
+        offset += CHECKPOINT.size
+        if len(data) - offset != body_count * BODY.size + weapon_count * WEAPON.size + enemy_count:
+            raise SaveError('The checkpoint is truncated')
+        bodies = list(BODY.iter_unpack(data[offset:offset + body_count * BODY.size]))
+        offset += body_count * BODY.size
+        weapons = list(WEAPON.iter_unpack(data[offset:offset + weapon_count * WEAPON.size]))
+        offset += weapon_count * WEAPON.size
+        enemies = [bool(left) for left in data[offset:]]
+        return cls(level_pointer, class_choice, signature, steps, shot_power, shot_angle, bodies, weapons, enemies)
+
+    def __repr__(self):
+        return (f'Checkpoint(level={self.level_pointer}, class={self.class_choice}, steps={self.steps}, '
+                f'weapons_left={sum(weapon[0] for weapon in self.weapons)}, enemies_left={sum(self.enemies)})')
+
+
+class SaveGame:
+    """
+    The progress and settings of the player, and the attempt they left part way through if there is one
+    """
+
+    def __init__(self, levels_completed=(), volume=1, class_choice=None, checkpoint=None):
+        """
+        Parameters
+        ----------
+        levels_completed : The numbers of the levels won
+        volume : The music volume from 0-1
+        class_choice : The number of the load-out last played, or None
+        checkpoint : The Checkpoint of the attempt left part way through, or None
+        """
+        self.levels_completed = list(levels_completed)
+        self.volume = volume
+        self.class_choice = class_choice
+        self.checkpoint = checkpoint
+
+    @classmethod
+    def from_game(cls, game):
+        """
+        Parameters
+        ----------
+        game : The Game being saved
+
+        Returns
+        -------
+        A save of the game's progress, settings and checkpoint
+        """
+        return cls(game.levels_completed, game.volume, game.class_choice, game.checkpoint)
+
+    def apply(self, game):
+        """
+        Parameters
+        ----------
+        game : The Game the save is loaded into, before its states are created
+        """
+        game.levels_completed = list(self.levels_completed)
+        game.volume = self.volume
+        game.class_choice = self.class_choice
+        game.checkpoint = self.checkpoint
+
+    def to_bytes(self):
+        """
+        Returns
+        -------
+        The save in its file format, a header followed by the compressed levels completed and checkpoint
+        """
+        body = struct.pack(f'<{len(self.levels_completed)}H', *self.levels_completed)
+        if self.checkpoint is not None:
+            body += self.checkpoint.to_bytes()
+        volume = max(0, min(100, round(self.volume * 100)))
+        header = HEADER.pack(MAGIC, VERSION, volume, self.class_choice or 0, len(self.levels_completed),
+                             self.checkpoint is not None)
+        return header + zlib.compress(body)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Parameters
+        ----------
+        data : The contents of a save file
+
+        Returns
+        -------
+        The save
+        """
+        try:
+            magic, version, volume, class_choice, completed_count, has_checkpoint = HEADER.unpack_from(data)
+            body = zlib.decompress(data[HEADER.size:])
+        except (struct.error, zlib.error) as error:
+            raise SaveError(f'Not a save: {error}') from error
+        if magic != MAGIC or version != VERSION:
+            raise SaveError(f'Not a version {VERSION} save')
+        completed_size = completed_count * 2
+        if len(body) < completed_size or (len(body) > completed_size) != bool(has_checkpoint):
+            raise SaveError('The save is truncated')
+        checkpoint = None
+        if has_checkpoint:
+            try:
+                checkpoint = Checkpoint.from_bytes(body, completed_size)
+            except struct.error as error:
+                raise SaveError(f'The checkpoint is truncated: {error}') from error
+        return cls(struct.unpack_from(f'<{completed_count}H', body), volume / 100, class_choice or None, checkpoint)
+
+    def save(self, path=SAVE_PATH):
+        """
+        Parameters
+        ----------
+        path : Where the save is written
+
+        Returns
+        -------
+        The path it was written to
+        """
+        write_atomic(path, self.to_bytes())
+        return path
+
+    @classmethod
+    def load(cls, path=SAVE_PATH):
+        """
+        Parameters
+        ----------
+        path : The save file
+
+        Returns
+        -------
+        The save read from it
+        """
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+    def __repr__(self):
+        return (f'SaveGame(levels_completed={self.levels_completed}, volume={self.volume}, '
+                f'class_choice={self.class_choice}, checkpoint={self.checkpoint})')
+
+
+def write_atomic(path, data):
+    """
+    Parameters
+    ----------
+    path : The file to write
+    data : The bytes written to it
+
+    Writes to a temporary file that replaces path once it is on disk, so a crash leaves either the old file or the new
+    one and never half of either
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+class SaveWriter:
+    """
+    Writes saves on a background thread so the frame loop never waits on the disk. Only the newest save waiting to be
+    written is kept, a save that is replaced before the thread gets to it is never written
+    """
+
+    def __init__(self, path=SAVE_PATH):
+        """
+        Parameters
+        ----------
+        path : Where every save is written
+        """
+        self.path = path
+        self.pending = None
+        self.writing = False
+        self.closed = False
+        # The bytes of the last save handed to the writer, an identical save is not written again
+        self.last = None
+        # The OSError of the last write that failed, or None
+        self.error = None
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def write(self, save_game):
+        """
+        Parameters
+        ----------
+        save_game : The SaveGame to write, turned into bytes straight away so the game can carry on changing
+        """
+        data = save_game.to_bytes()
+        with self.condition:
+            if data == self.last or self.closed:
+                return
+            self.last = data
+            self.pending = data
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='SaveWriter', daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def run(self):
+        """
+        Writes each pending save until the writer is closed
+        """
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                data, self.pending = self.pending, None
+                self.writing = True
+            try:
+                write_atomic(self.path, data)
+                self.error = None
+            except OSError as error:
+                self.error = error
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+    def flush(self):
+        """
+        Waits until every save handed to the writer is on disk
+        """
+        with self.condition:
+            while self.pending is not None or self.writing:
+                self.condition.wait()
+
+    def close(self):
+        """
+        Writes the last pending save and stops the thread
+        """
+        self.flush()
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,103 @@
+"""
+This is the simulation module, it runs levels headless so shots can be tested without a window or the frame clock
+"""
+import time
+from levels import Level
+
+# The speed below which a shot counts as settled, a ball rolling along the floor slower than this hits nothing new
+SETTLE_SPEED = 30
+
+
+class HeadlessGame:
+    """
+    Stands in for the Game class, holding only the attributes a Level reads while it is loaded and simulated
+    """
+
+    def __init__(self, level_pointer, class_choice):
+        """
+        Parameters
+        ----------
+        level_pointer : The number of the level to load
+        class_choice : The number of the load-out to load
+        """
+        self.display = None
+        self.images = {}
+        self.block_textures = False
+        self.running = True
+        self.in_game = True
+        self.level_pointer = level_pointer
+        self.class_choice = class_choice
+        self.pool_sizes = None
+
+
+class SimulationResult:
+    """
+    Holds the outcome of one headless attempt at a level
+    """
+
+    def __init__(self, level):
+        """
+        Parameters
+        ----------
+        level : The Level that has finished simulating
+        """
+        self.status = level.status()
+        self.won = self.status == 1
+        self.steps = level.steps
+        self.enemies_left = len(level.enemies)
+        self.weapons_left = len(level.weapons)
+        self.wall_time = 0
+
+    def __repr__(self):
+        return (f'SimulationResult(status={self.status}, steps={self.steps}, enemies_left={self.enemies_left}, '
+                f'weapons_left={self.weapons_left}, wall_time={self.wall_time:.4f})')
+
+
+def build_level(level_pointer, class_choice, data=None):
+    """
+    Parameters
+    ----------
+    level_pointer : The number of the level to load
+    class_choice : The number of the load-out to load
+    data : A compiled level to load instead of the level numbered level_pointer in the library
+
+    Returns
+    -------
+    A headless Level with its load-out and level data loaded
+    """
+    level = Level(HeadlessGame(level_pointer, class_choice), headless=True, data=data)
+    level.load_class()
+    level.load_level()
+    return level
+
+
+def simulate(level_pointer, class_choice, shots, dt=1 / 165, max_time=60, settle_speed=SETTLE_SPEED, data=None):
+    """
+    Parameters
+    ----------
+    level_pointer : The number of the level to load
+    class_choice : The number of the load-out to load
+    shots : A sequence of (shot_power, shot_angle) pairs fired in order
+    dt : The length in seconds of each physics step
+    max_time : The simulated time in seconds after which the attempt is given up
+    settle_speed : The speed below which every body counts as resting so the weapon timeout can be skipped, or None
+    data : A compiled level to load instead of the level numbered level_pointer in the library
+
+    Returns
+    -------
+    A SimulationResult describing whether the shots won the level
+
+    Builds a fresh level and fires the shots at it as fast as the CPU allows
+    """
+    start = time.perf_counter()
+    level = build_level(level_pointer, class_choice, data)
+    level.simulate(shots, dt, max_time, settle_speed)
+    result = SimulationResult(level)
+    result.wall_time = time.perf_counter() - start
+    return result
+
+
+if __name__ == "__main__":
+    for power in range(0, 1001, 100):
+        for angle in range(0, 91, 15):
+            print(power, angle, simulate(1, 1, [(power, angle)]))
@@ -0,0 +1,224 @@
+"""
+This is the solver module, it searches the power and angle of each shot for sequences of shots that win a level
+"""
+import multiprocessing
+import os
+import sys
+import time
+from level_data import level_library
+from simulation import SETTLE_SPEED, simulate
+
+# The smallest changes the player can make to the power and angle with A/D and W/S
+POWER_STEP = 10
+ANGLE_STEP = 1
+MAX_POWER = 1000
+MAX_ANGLE = 90
+
+
+def evaluate(task):
+    """
+    Parameters
+    ----------
+    task : A tuple of (level_pointer, class_choice, shots, settle_speed)
+
+    Returns
+    -------
+    The shots, whether they won the level and how many enemies were left
+
+    Runs in the worker processes so it has to be a module level function
+    """
+    level_pointer, class_choice, shots, settle_speed = task
+    result = simulate(level_pointer, class_choice, shots, settle_speed=settle_speed)
+    return shots, result.won, result.enemies_left
+
+
+def finer(step, smallest):
+    """
+    Parameters
+    ----------
+    step : The current distance between candidates
+    smallest : The smallest distance the player can tell apart
+
+    Returns
+    -------
+    About half the step, kept a multiple of the smallest step
+    """
+    return max(smallest, round(step / 2 / smallest) * smallest)
+
+
+class ShotSolver:
+    """
+    Searches the power and angle of each shot on a coarse grid and refines around the best candidates, spreading the
+    simulations over a pool of processes
+    """
+
+    def __init__(self, level_pointer, processes=None, power_step=100, angle_step=10, refine_count=8, beam_width=3):
+        """
+        Parameters
+        ----------
+        level_pointer : The number of the level to solve
+        processes : How many processes simulate shots, every core if not given
+        power_step : The distance between powers on the coarse grid
+        angle_step : The distance between angles on the coarse grid
+        refine_count : How many of the best candidates are refined at each finer step
+        beam_width : How many of the best unfinished sequences are continued with another shot
+        """
+        self.level_pointer = level_pointer
+        self.processes = processes or os.cpu_count() or 1
+        self.power_step = power_step
+        self.angle_step = angle_step
+        self.refine_count = refine_count
+        self.beam_width = beam_width
+        self.pool = None
+        self.evaluations = 0
+
+    def __enter__(self):
+        if self.processes > 1:
+            self.pool = multiprocessing.Pool(self.processes)
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def evaluate_many(self, class_choice, sequences, settle_speed=SETTLE_SPEED):
+        """
+        Parameters
+        ----------
+        class_choice : The number of the load-out being solved
+        sequences : A list of tuples of (shot_power, shot_angle) shots
+        settle_speed : The speed below which a shot is cut short as everything is resting, or None to play every weapon
+            until it times out as it does in the game
+
+        Returns
+        -------
+        A dictionary of each sequence and a (won, enemies_left) tuple
+        """
+        tasks = [(self.level_pointer, class_choice, sequence, settle_speed) for sequence in sequences]
+        self.evaluations += len(tasks)
+        if self.pool is None:
+            results = map(evaluate, tasks)
+        else:
+            results = self.pool.imap_unordered(evaluate, tasks, chunksize=max(1, len(tasks) // (self.processes * 4)))
+        return {shots: (won, enemies_left) for shots, won, enemies_left in results}
+
+    def search_shot(self, class_choice, prefix):
+        """
+        Parameters
+        ----------
+        class_choice : The number of the load-out being solved
+        prefix : The shots already fired before the one being searched
+
+        Returns
+        -------
+        A dictionary of every sequence tried, prefix plus one more shot, and its (won, enemies_left) tuple
+        """
+        grid = [prefix + ((power, angle),)
+                for power in range(0, MAX_POWER + 1, self.power_step)
+                for angle in range(0, MAX_ANGLE + 1, self.angle_step)]
+        results = self.evaluate_many(class_choice, grid)
+        power_step, angle_step = self.power_step, self.angle_step
+        while power_step > POWER_STEP or angle_step > ANGLE_STEP:
+            power_step, angle_step = finer(power_step, POWER_STEP), finer(angle_step, ANGLE_STEP)
+            best = sorted(results, key=lambda shots: (not results[shots][0], results[shots][1]))[:self.refine_count]
+            neighbours = set()
+            for shots in best:
+                power, angle = shots[-1]
+                for p in (power - power_step, power, power + power_step):
+                    for a in (angle - angle_step, angle, angle + angle_step):
+                        if 0 <= p <= MAX_POWER and 0 <= a <= MAX_ANGLE:
+                            neighbours.add(prefix + ((p, a),))
+            results.update(self.evaluate_many(class_choice, [shots for shots in neighbours if shots not in results]))
+        return results
+
+    def solve_loadout(self, class_choice):
+        """
+        Parameters
+        ----------
+        class_choice : The number of the load-out being solved
+
+        Returns
+        -------
+        The winning sequences with the fewest shots, each a tuple of (shot_power, shot_angle) shots
+        """
+        weapons = len(level_library.get(self.level_pointer)['loadouts'].get(class_choice, ()))
+        beam = [()]
+        for depth in range(weapons):
+            results = {}
+            for prefix in beam:
+                results.update(self.search_shot(class_choice, prefix))
+            winners = sorted(shots for shots, (won, enemies_left) in results.items() if won)
+            if winners:
+                # The search cuts shots short once everything is resting, so the winners are played again in full
+                checked = self.evaluate_many(class_choice, winners, settle_speed=None)
+                results.update(checked)
+                winners = [shots for shots in winners if checked[shots][0]]
+                if winners:
+                    return winners
+            # Only sequences that destroyed something are worth following up with another shot
+            enemies = len(level_library.get(self.level_pointer)['enemies'])
+            progress = [shots for shots in results if results[shots][1] < enemies]
+            if not progress:
+                # Following the same sequences again would only repeat the same search
+                break
+            beam = sorted(progress, key=lambda shots: results[shots][1])[:self.beam_width]
+        return []
+
+    def solve(self):
+        """
+        Returns
+        -------
+        A dictionary of each load-out number and its winning sequences
+        """
+        loadouts = level_library.get(self.level_pointer)['loadouts']
+        return {class_choice: self.solve_loadout(class_choice) for class_choice in sorted(loadouts)}
+
+
+def solve(level_pointer, processes=None, **options):
+    """
+    Parameters
+    ----------
+    level_pointer : The number of the level to solve
+    processes : How many processes simulate shots, every core if not given
+    options : Passed on to ShotSolver to tune the search
+
+    Returns
+    -------
+    A dictionary of each load-out number and the winning sequences of shots for it
+    """
+    with ShotSolver(level_pointer, processes, **options) as solver:
+        return solver.solve()
+
+
+def report(level_pointers=None, processes=None):
+    """
+    Parameters
+    ----------
+    level_pointers : The numbers of the levels to check, every level if not given
+    processes : How many processes simulate shots, every core if not given
+
+    Returns
+    -------
+    The lines of a report saying which load-outs can win each level and with which shots
+    """
+    lines = []
+    for level_pointer in level_pointers or range(1, len(level_library) + 1):
+        start = time.perf_counter()
+        with ShotSolver(level_pointer, processes) as solver:
+            solutions = solver.solve()
+        lines.append(f'Level {level_pointer}: {solver.evaluations} shots simulated in '
+                     f'{time.perf_counter() - start:.1f} s')
+        for class_choice, sequences in solutions.items():
+            if sequences:
+                shown = ', '.join(' then '.join(f'power {p} angle {a}' for p, a in shots) for shots in sequences[:3])
+                lines.append(f'  class {class_choice}: winnable in {len(sequences[0])} shot(s), '
+                             f'{len(sequences)} found, e.g. {shown}')
+            else:
+                lines.append(f'  class {class_choice}: no winning shots found')
+    return lines
+
+
+if __name__ == "__main__":
+    print('\n'.join(report([int(arg) for arg in sys.argv[1:]] or None)))
@@ -2,16 +2,33 @@
 This is the sprites module, which contains all the sprites
 """
 import math
+import numpy as np
 import pygame as pg
 import pymunk as pm
 from pymunk import pygame_util
-import os
 from pymunk import Vec2d
+from resources import scaled_surfaces, rotated_surfaces, fonts, text_surfaces
 
 # lets Pymunk know that increasing y coordinate moves down towards bottom of the screen
 pm.pygame_util.positive_y_is_up = False
 
 
+def box_vertices(size):
+    """
+    Parameters
+    ----------
+    size : Width and Height of the box
+
+    Returns
+    -------
+    The corners of the box around (0, 0) in the order pm.Poly.create_box gives them, so a pooled shape given them
+    collides exactly like a new box
+    """
+    width, height = size
+    bb = pm.BB(-width / 2, -height / 2, width / 2, height / 2)
+    return [(bb.right, bb.bottom), (bb.right, bb.top), (bb.left, bb.top), (bb.left, bb.bottom)]
+
+
 class MenuComponents(pg.sprite.Sprite):
     """
     Initializes the common attributes among its children, Button and Label
@@ -33,11 +50,11 @@ class MenuComponents(pg.sprite.Sprite):
         self.x, self.y = pos
         self.width, self.height = size
         self.font_size = font_size
-        self.font = pg.font.Font({"Bungee": os.path.join(os.path.dirname(os.path.realpath(__file__)), "assets", "fonts",
-                                                         "BungeeSpice-Regular.ttf")}["Bungee"], self.font_size)
-        self.text = self.font.render(text, False, self.colour)
-        self.image = game.images['button_image']
-        self.image = pg.transform.scale(self.image, (self.width, self.height))
+        self.font = fonts.get(self.font_size)
+        self.text = text_surfaces.render(text, self.font_size, self.colour)
+        self.image = scaled_surfaces.get(game.images['button_image'], (self.width, self.height))
+        # The text never moves so it is only centred once
+        self.pos_text()
 
     def pos_text(self):
         """
@@ -72,6 +89,9 @@ class Button(MenuComponents):
         if locked:
             text = 'locked'
         super().__init__(game, pos, size, text, font_size)
+        # Both looks of the button are scaled once from the original image and swapped between when hovered
+        self.normal_image = self.image
+        self.hover_image = scaled_surfaces.get(game.images['button_image'], (self.width + 10, self.height + 10))
         self.rect = pg.Rect((self.x, self.y), (self.width, self.height))
         self.low = text.lower()
         self.locked = locked
@@ -86,17 +106,20 @@ class Button(MenuComponents):
 
     def draw(self):
         """
+        Returns
+        -------
+        The area of the screen that was drawn over
+
         Draws the button. If the button is hovered, the button increases in size to show the user they are hovering over it. After drawing the button, the text is drawn over the center of it.
         """
         if self.is_hovered():
-            self.image = pg.transform.scale(self.image, (self.width + 10, self.height + 10))
-            self.display.blit(self.image, (self.x, self.y))
+            self.image = self.hover_image
         else:
-            self.image = pg.transform.scale(self.image, (self.width, self.height))
-            self.display.blit(self.image, (self.x, self.y))
+            self.image = self.normal_image
+        rect = self.display.blit(self.image, (self.x, self.y))
         if hasattr(self, "text"):
-            self.pos_text()
-            self.display.blit(self.text, self.pos)
+            rect = rect.union(self.display.blit(self.text, self.pos))
+        return rect
 
 
 class Label(MenuComponents):
@@ -118,11 +141,15 @@ class Label(MenuComponents):
 
     def draw(self):
         """
+        Returns
+        -------
+        The area of the screen that was drawn over
+
         Draws label onto screen
         """
         if hasattr(self, "text"):
-            self.pos_text()
-            self.display.blit(self.text, self.pos)
+            return self.display.blit(self.text, self.pos)
+        return pg.Rect(self.x, self.y, 0, 0)
 
 
 class Floor(pg.sprite.Sprite):
@@ -140,18 +167,104 @@ class Floor(pg.sprite.Sprite):
         self.body_shape.mass = 2
         self.body_shape.elasticity = 0.5
         self.body_shape.friction = 0.7
+        self.reset(start, end, space)
+
+    def reset(self, start, end, space):
+        """
+
+        Parameters
+        ----------
+        start : The start of the floor
+        end : The end of the floor
+        space : The space it is added to
+
+        Moves the floor to start and end and adds it to space, so a pooled floor can be used by another level
+        """
+        if (start, end) != (self.start, self.end):
+            self.start = start
+            self.end = end
+            self.body_shape.unsafe_set_endpoints(start, end)
         space.add(self.body, self.body_shape)
 
-    def draw(self):
+    def draw(self, surface=None):
         """
+
+        Parameters
+        ----------
+        surface : The surface to draw onto, the screen if not given
+
+        Returns
+        -------
+        The area of the surface that was drawn over
+
         Draws the floor onto the screen
         """
-        pg.draw.line(self.display, 'blue', start_pos=pygame_util.to_pygame(self.start, self.display),
+        if surface is None:
+            surface = self.display
+        return pg.draw.line(surface, 'blue', start_pos=pygame_util.to_pygame(self.start, surface),
                      end_pos=pygame_util.to_pygame(
-                         self.end, self.display), width=18)
+                         self.end, surface), width=18)
+
+
+class PhysicsSprite(pg.sprite.Sprite):
+    """
+    Initializes the common attributes among the sprites with a pymunk body: Block, Projectiles and Enemy
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.body = None
+        self.previous_position = None
+        self.previous_angle = 0
+
+    def place(self, position, angle=0):
+        """
+
+        Parameters
+        ----------
+        position : Where the body is put
+        angle : The angle the body is turned to
+
+        Puts the body at rest at position, with nothing left over from wherever it was used last
+        """
+        # Chipmunk keeps the push out of overlaps from the last step to move the body by on the next, a step of no
+        # time spends it without moving the body
+        pm.Body.update_position(self.body, 0)
+        self.body.position = position
+        self.body.angle = angle
+        self.body.velocity = (0, 0)
+        self.body.angular_velocity = 0
+        self.body.force = (0, 0)
+        self.body.torque = 0
+        self.previous_position = None
+        self.previous_angle = 0
+
+    def save_state(self):
+        """
+        Remembers the position and angle of the body before the space is stepped
+        """
+        self.previous_position = self.body.position
+        self.previous_angle = self.body.angle
+
+    def interpolate(self, alpha):
+        """
+
+        Parameters
+        ----------
+        alpha : How far, from 0-1, the frame is between the previous physics step and the current one
+
+        Returns
+        -------
+        The position and angle the body should be drawn at
+        """
+        if self.previous_position is None or alpha >= 1:
+            return self.body.position, self.body.angle
+        position = self.previous_position.interpolate_to(self.body.position, alpha)
+        angle = self.previous_angle + (self.body.angle - self.previous_angle) * alpha
+        return position, angle
 
 
-class Block(pg.sprite.Sprite):
+class Block(PhysicsSprite):
     """
     Creates Blocks used in the levels
     """
@@ -172,44 +285,99 @@ class Block(pg.sprite.Sprite):
         self.game = game
         self.width, self.height = size
         self.display = game.display
+        # The texture is scaled to the block and rotated to its angle through the shared caches when it is drawn
+        self.texture = None
         if body == 'dynamic':
             self.body = pm.Body(body_type=pm.Body.DYNAMIC)
-            # How I would add the dynamic images if they worked
-            # self.image = game.images['block_dynamic_image']
-            # self.image = pg.transform.scale(self.image, (self.width, self.height))
+            if game.block_textures:
+                self.texture = game.images['block_dynamic_image']
         elif body == 'static':
             self.body = pm.Body(body_type=pm.Body.STATIC)
-            # How I would add the static images if they worked
-            # self.image = game.images['block_static_image']
-            # self.image = pg.transform.scale(self.image, (self.width, self.height))
-        self.body.position = pos
-        self.body.angle = angle
+            if game.block_textures:
+                self.texture = game.images['block_static_image']
+        self.is_static = body == 'static'
         # creates the shape of the block around its centre of gravity which is originally (0, 0)
         self.body_shape = pm.Poly.create_box(self.body, (self.width, self.height))
-        self.corners = self.body_shape.get_vertices()
         self.body_shape.mass = 2
         self.body_shape.elasticity = 0.5
         self.body_shape.friction = 0.7
+        self.reset(pos, size, angle, space)
+
+    def reset(self, pos: Vec2d, size, angle, space):
+        """
+
+        Parameters
+        ----------
+        pos : X and Y coordinate of the middle of the block
+        size : Width and Height of the block
+        angle : The angle of the block
+        space : The space it is added to
+
+        Reshapes the block, puts it at rest at pos and adds it to space, so a pooled block can be used by another level
+        """
+        if tuple(size) != (self.width, self.height):
+            self.width, self.height = size
+            self.body_shape.unsafe_set_vertices(box_vertices(size))
+        self.corners = self.body_shape.get_vertices()
+        self.place(pos, angle)
         space.add(self.body, self.body_shape)
 
-    def draw(self):
+    def draw_key(self, points, pose):
+        """
+
+        Parameters
+        ----------
+        points : The array of corners moved into place by a PolygonBatch
+        pose : The x, y and angle the corners were moved to
+
+        Returns
+        -------
+        A value that only changes when the block would be drawn differently, the pixel its texture is centred on and the
+        rotation it is drawn at, or the pixels of its corners if it has no texture
         """
-        Draws the block
+        if self.texture is not None:
+            return round(pose[0]), round(pose[1]), rotated_surfaces.quantize(-math.degrees(pose[2]))
+        return points.tobytes()
+
+    def draw(self, alpha=1, surface=None, points=None, pose=None):
         """
-        vertex = []
-        # This for loop translates the corners of the block so that it is no longer drawn around (0, 0) and instead drawn around its position
-        # The for loop also allows the blocks to be rotated
-        for point in self.corners:
-            updated_point = (point.rotated(self.body_shape.body.angle) + self.body.position)
-            vertex.append(pygame_util.to_pygame(updated_point, self.game.display))
 
-        pg.draw.polygon(self.game.display, 'blue', vertex)
-        if hasattr(self, 'image'):
-            self.image = pg.transform.rotate(self.image, math.degrees(self.body.angle))
-            self.game.display.blit(self.image, self.body.position - (self.width // 2, self.height // 2))
+        Parameters
+        ----------
+        alpha : How far, from 0-1, the frame is between the previous physics step and the current one
+        surface : The surface to draw onto, the screen if not given
+        points : The corners already moved into place by a PolygonBatch, worked out here if not given
+        pose : The x, y and angle the PolygonBatch moved the corners to, worked out here if not given
 
+        Returns
+        -------
+        The area of the surface that was drawn over
 
-class Projectiles(pg.sprite.Sprite):
+        Draws the block, textured if it has a texture
+        """
+        if surface is None:
+            surface = self.game.display
+        if pose is None:
+            position, angle = self.interpolate(alpha)
+        else:
+            position, angle = Vec2d(pose[0], pose[1]), pose[2]
+        if self.texture is not None:
+            # pymunk angles turn clockwise on screen as y points down, pygame rotates anticlockwise
+            image = rotated_surfaces.get(self.texture, (self.width, self.height), -math.degrees(angle))
+            return surface.blit(image, image.get_rect(center=pygame_util.to_pygame(position, surface)))
+        vertex = points
+        if vertex is None:
+            vertex = []
+            # This for loop translates the corners of the block so that it is no longer drawn around (0, 0) and instead drawn around its position
+            # The for loop also allows the blocks to be rotated
+            for point in self.corners:
+                updated_point = (point.rotated(angle) + position)
+                vertex.append(pygame_util.to_pygame(updated_point, surface))
+
+        return pg.draw.polygon(surface, 'blue', vertex)
+
+
+class Projectiles(PhysicsSprite):
     """
     Initializes the common attributes among its children
     """
@@ -218,19 +386,38 @@ class Projectiles(pg.sprite.Sprite):
         super().__init__()
         self.display = display
         self.radius = radius
-        self.space = space
         self.body = pm.Body(body_type=pm.Body.DYNAMIC)
-        self.body.angle = 0
-        self.body.position = pos
         self.body_shape = pm.Circle(self.body, self.radius)
+        self.body_shape.collision_type = 1
+        self.power_factor = 7
+        self.reset(pos, radius, space, mass, friction, elasticity)
+
+    def reset(self, pos: Vec2d, radius, space, mass, friction, elasticity):
+        """
+
+        Parameters
+        ----------
+        pos : X and Y coordinate of the centre of the projectile
+        radius : The radius of the projectile
+        space : The space it is added to
+        mass : The mass of the projectile
+        friction : The friction of the projectile
+        elasticity : The elasticity of the projectile
+
+        Reshapes the projectile, puts it unlaunched at pos and adds it to space, so a pooled projectile can be used by
+        another level
+        """
+        if radius != self.radius:
+            self.radius = radius
+            self.body_shape.unsafe_set_radius(radius)
         self.body_shape.mass = mass
         self.body_shape.friction = friction
         self.body_shape.elasticity = elasticity
+        self.place(pos)
+        self.space = space
         self.space.add(self.body, self.body_shape)
         self.is_shot = False
         self.time_after_collision = 0
-        self.body_shape.collision_type = 1
-        self.power_factor = 7
 
     def remove(self):
         """
@@ -243,6 +430,7 @@ class Projectiles(pg.sprite.Sprite):
         loads the next projectile to be shot to its starting position
         """
         self.body.position = Vec2d(140, 480)
+        self.save_state()
 
 
 class CannonBall(Projectiles):
@@ -250,12 +438,22 @@ class CannonBall(Projectiles):
         super().__init__(display, pos, radius, space, mass, friction, elasticity)
         pg.sprite.Sprite.__init__(self)
 
-    def draw(self):
+    def draw(self, alpha=1):
         """
+
+        Parameters
+        ----------
+        alpha : How far, from 0-1, the frame is between the previous physics step and the current one
+
+        Returns
+        -------
+        The area of the screen that was drawn over
+
         Draws circle at its centre
         """
-        self.center = pygame_util.to_pygame(self.body.position, self.display)
-        pg.draw.circle(self.display, 'blue', self.center, self.radius + 1)
+        position, angle = self.interpolate(alpha)
+        self.center = pygame_util.to_pygame(position, self.display)
+        return pg.draw.circle(self.display, 'blue', self.center, self.radius + 1)
 
     def launch(self, shot_power, shot_angle):
         """
@@ -300,12 +498,16 @@ class PowerSlider(pg.sprite.Sprite):
         ----------
         shot_power : The value from 0-1000 used to determine it as a percentage of 1000
 
+        Returns
+        -------
+        The area of the screen that was drawn over
+
         Width of inner rectangle relies on the percentage
         """
         percentage = (shot_power / 1000)
         self.rect_in.width = self.width * percentage
-        pg.draw.rect(self.display, 'blue', self.rect_out, 5)
-        pg.draw.rect(self.display, 'black', self.rect_in, 5)
+        rect = pg.draw.rect(self.display, 'blue', self.rect_out, 5)
+        return rect.union(pg.draw.rect(self.display, 'black', self.rect_in, 5))
 
 
 class AngleGraphic(pg.sprite.Sprite):
@@ -336,15 +538,19 @@ class AngleGraphic(pg.sprite.Sprite):
         ----------
         shot_angle : The value from 0-90 used to determine it as a percentage of 90
 
+        Returns
+        -------
+        The area of the screen that was drawn over
+
         Width of inner rectangle relies on the percentage
         """
         percentage = (shot_angle / 90)
         self.rect_in.width = self.width * percentage
-        pg.draw.rect(self.display, 'blue', self.rect_out, 5)
-        pg.draw.rect(self.display, 'black', self.rect_in, 5)
+        rect = pg.draw.rect(self.display, 'blue', self.rect_out, 5)
+        return rect.union(pg.draw.rect(self.display, 'black', self.rect_in, 5))
 
 
-class Enemy(pg.sprite.Sprite):
+class Enemy(PhysicsSprite):
     """
     Creates enemy sprites
     """
@@ -363,28 +569,72 @@ class Enemy(pg.sprite.Sprite):
         self.display = display
         self.width, self.height = size
         self.body = pm.Body(body_type=pm.Body.DYNAMIC)
-        self.body.position = pos
         self.body_shape = pm.Poly.create_box(self.body, (self.width, self.height))
         self.body_shape.collision_type = 2
         self.body_shape.mass = 2
         self.body_shape.friction = 0.5
         self.body_shape.elasticity = 0.5
+        self.reset(pos, size, space)
+
+    def reset(self, pos: Vec2d, size, space):
+        """
+
+        Parameters
+        ----------
+        pos : X and Y coordinates of the centre of the enemy
+        size : Width and Height of enemy
+        space : The space it is added to
+
+        Reshapes the enemy, puts it at rest at pos and adds it to space, so a pooled enemy can be used by another level
+        """
+        if tuple(size) != (self.width, self.height):
+            self.width, self.height = size
+            self.body_shape.unsafe_set_vertices(box_vertices(size))
         self.corners = self.body_shape.get_vertices()
+        self.place(pos)
         self.space = space
         self.space.add(self.body, self.body_shape)
 
-    def draw(self):
+    def draw_key(self, points, pose):
+        """
+
+        Parameters
+        ----------
+        points : The array of corners moved into place by a PolygonBatch
+        pose : The x, y and angle the corners were moved to
+
+        Returns
+        -------
+        A value that only changes when the enemy would be drawn differently, the pixels of its corners
+        """
+        return points.tobytes()
+
+    def draw(self, alpha=1, points=None, pose=None):
         """
+
+        Parameters
+        ----------
+        alpha : How far, from 0-1, the frame is between the previous physics step and the current one
+        points : The corners already moved into place by a PolygonBatch, worked out here if not given
+        pose : The x, y and angle the PolygonBatch moved the corners to, not needed to draw a plain polygon
+
+        Returns
+        -------
+        The area of the screen that was drawn over
+
         Draws the enemy
         """
+        if points is not None:
+            return pg.draw.polygon(self.display, 'yellow', points)
+        position, angle = self.interpolate(alpha)
         # This for loop translates the corners of the block so that it is no longer drawn around (0, 0) and instead drawn around its position
         # The for loop also allows the blocks to be rotated
         vertex = []
         for point in self.corners:
-            updated_point = (point.rotated(self.body_shape.body.angle) + self.body.position)
+            updated_point = (point.rotated(angle) + position)
             vertex.append(pygame_util.to_pygame(updated_point, self.display))
 
-        pg.draw.polygon(self.display, 'yellow', vertex)
+        return pg.draw.polygon(self.display, 'yellow', vertex)
 
     def remove(self):
         """
@@ -421,12 +671,16 @@ class VolumeSlider(pg.sprite.Sprite):
         ----------
         volume : value of from 0-1 used to determine it as a percentage of 1
 
+        Returns
+        -------
+        The area of the screen that was drawn over
+
         Width of inner rectangle relies on the percentage
         """
         percentage = (volume / 1)
         self.rect_in.width = self.width * percentage
-        pg.draw.rect(self.display, 'black', self.rect_in)
-        pg.draw.rect(self.display, 'blue', self.rect_out, 5)
+        rect = pg.draw.rect(self.display, 'black', self.rect_in)
+        return rect.union(pg.draw.rect(self.display, 'blue', self.rect_out, 5))
 
     def is_hovered(self):
         """
@@ -467,11 +721,145 @@ class ShotIndicator(pg.sprite.Sprite):
         ----------
         shot_angle : The value from 0-90 of the body angle
 
+        Returns
+        -------
+        The area of the screen that was drawn over
+
         Used to determine end position of the line
         """
 
         # Uses trigonometry to calculate end x position and end y position
-        pg.draw.line(self.display, 'white', self.start,
+        return pg.draw.line(self.display, 'white', self.start,
                      (self.start[0] + int((self.length * math.cos(math.radians(shot_angle)))),
                       (self.start[1] -
                        int((self.length * math.sin(math.radians(shot_angle)))))), self.width)
+
+
+class TrajectoryPreview(pg.sprite.Sprite):
+    """
+    Draws the path the loaded projectile is predicted to take with the current power and angle
+    """
+
+    def __init__(self, display, space, points=90, duration=3, bounces=1):
+        """
+
+        Parameters
+        ----------
+        display : The screen to be drawn to
+        space : The space the projectile is launched into, used for its gravity and to find what it hits
+        points : How many points the path is made of
+        duration : How many seconds of flight the path covers
+        bounces : How many times the path bounces off the level before it stops, 0 to stop at the first hit
+        """
+        super().__init__()
+        self.display = display
+        self.space = space
+        self.points = points
+        self.duration = duration
+        self.bounces = bounces
+        self.key = None
+        self.path = []
+
+    def compute(self, weapon, shot_power, shot_angle):
+        """
+
+        Parameters
+        ----------
+        weapon : The loaded projectile
+        shot_power : The value from 0-1000 of the shot
+        shot_angle : The value from 0-90 of the shot
+
+        Works out the path again, but only when the projectile, its position, the power or the angle changed
+        """
+        key = (weapon, round(weapon.body.position.x), round(weapon.body.position.y), shot_power, shot_angle)
+        if key == self.key:
+            return
+        self.key = key
+        # The same velocity launch() gives the body: the impulse turned by the angle, divided by the mass
+        velocity = Vec2d(weapon.power_factor * shot_power / weapon.body.mass, 0).rotated(math.radians(shot_angle))
+        self.path = self.trace(weapon, weapon.body.position, velocity)
+
+    def trace(self, weapon, start, velocity):
+        """
+
+        Parameters
+        ----------
+        weapon : The projectile being traced, it and the other projectiles are not treated as obstacles
+        start : The position the projectile starts from
+        velocity : The velocity the projectile starts with
+
+        Returns
+        -------
+        The list of points on the path, ending where it hits the level after its last bounce
+        """
+        gravity = np.array(self.space.gravity)
+        times = np.linspace(0, self.duration, self.points)[:, None]
+        path = [tuple(start)]
+        remaining = self.bounces
+        contacts = 0
+        while True:
+            # Every point of the arc in one go: start + velocity * t + gravity * t^2 / 2
+            arc = np.array(start) + np.array(velocity) * times + 0.5 * gravity * times ** 2
+            hit = None
+            for i in range(1, len(arc)):
+                hit = self.first_hit(weapon, arc[i - 1], arc[i])
+                if hit is not None:
+                    break
+            if hit is None:
+                path.extend(map(tuple, arc[1:]))
+                return path
+            # Where the centre of the projectile is when it touches the surface
+            centre = arc[i - 1] + (arc[i] - arc[i - 1]) * hit.alpha
+            path.extend(map(tuple, arc[1:i]))
+            path.append(tuple(centre))
+            # Velocity at the hit, reflected off the surface and slowed by how bouncy both shapes are
+            t = (i - 1 + hit.alpha) * self.duration / (self.points - 1)
+            velocity = Vec2d(*(np.array(velocity) + gravity * t))
+            contacts += 1
+            # Grazing a surface is rolling along it rather than bouncing off it
+            if abs(velocity.dot(hit.normal)) > 100:
+                remaining -= 1
+            if remaining < 0 or contacts > 10:
+                return path
+            elasticity = weapon.body_shape.elasticity * hit.shape.elasticity
+            friction = weapon.body_shape.friction * hit.shape.friction
+            normal_speed = velocity.dot(hit.normal)
+            tangent = velocity - normal_speed * hit.normal
+            # Friction slows the sliding along the surface, at most to the speed of a ball rolling without slipping
+            slowdown = min(friction * (1 + elasticity) * abs(normal_speed), tangent.length / 3)
+            if tangent.length > 0:
+                tangent = tangent.scale_to_length(tangent.length - slowdown)
+            velocity = tangent - elasticity * normal_speed * hit.normal
+            start = Vec2d(*centre) + hit.normal * 0.5
+
+    def first_hit(self, weapon, start, end):
+        """
+
+        Parameters
+        ----------
+        weapon : The projectile being traced
+        start : The start of the segment of the path
+        end : The end of the segment of the path
+
+        Returns
+        -------
+        The pymunk SegmentQueryInfo of the first shape the projectile would hit along the segment, or None
+        """
+        # Slightly thinner than the projectile so the surface it is resting on does not count as a hit
+        radius = max(weapon.radius - 1, 0)
+        hits = [hit for hit in self.space.segment_query(tuple(start), tuple(end), radius, pm.ShapeFilter())
+                if hit.shape.collision_type != weapon.body_shape.collision_type]
+        return min(hits, key=lambda hit: hit.alpha) if hits else None
+
+    def draw(self):
+        """
+        Returns
+        -------
+        The area of the screen that was drawn over
+
+        Draws the path as a series of dots
+        """
+        rect = pg.Rect(self.path[0], (0, 0)) if self.path else pg.Rect(0, 0, 0, 0)
+        for point in self.path[::3]:
+            rect.union_ip(pg.draw.circle(self.display, 'white', point, 3))
+        return rect
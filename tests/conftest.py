@@ -0,0 +1,25 @@
+"""
+Runs the tests headless on SDL's dummy drivers, with the game's flat modules importable from the repository root
+"""
+import os
+import sys
+
+# The dummy drivers have to be chosen before pygame opens a window or the mixer
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame as pg
+import pytest
+
+
+@pytest.fixture
+def display():
+    """
+    Returns
+    -------
+    A dummy screen the size of the game's window
+    """
+    pg.init()
+    yield pg.display.set_mode((1280, 720))
+    pg.quit()
@@ -0,0 +1,61 @@
+import pygame as pg
+import pymunk as pm
+from collisions import CollisionRegistry
+
+BALL, TARGET = 1, 2
+
+
+class Entity(pg.sprite.Sprite):
+    def __init__(self, space, position, collision_type, body_type=pm.Body.DYNAMIC):
+        super().__init__()
+        self.body = pm.Body(1, 100, body_type=body_type)
+        self.body.position = position
+        self.body_shape = pm.Circle(self.body, 10)
+        self.body_shape.collision_type = collision_type
+        space.add(self.body, self.body_shape)
+
+
+def overlapping_pair():
+    space = pm.Space()
+    registry = CollisionRegistry(space)
+    ball = Entity(space, (0, 0), BALL)
+    target = Entity(space, (15, 0), TARGET)
+    registry.register(ball, target)
+    return space, registry, ball, target
+
+
+def test_handlers_are_given_the_sprites():
+    space, registry, ball, target = overlapping_pair()
+    seen = []
+    registry.on(BALL, TARGET, begin=lambda a, b, arbiter: seen.append((a, b)))
+    space.step(1 / 60)
+    assert seen == [(ball, target)]
+
+
+def test_removal_waits_for_the_step_to_finish():
+    space, registry, ball, target = overlapping_pair()
+    group = pg.sprite.Group(target)
+    in_space_during_step = []
+
+    def hit(ball, target, arbiter):
+        registry.remove_later(target, group)
+        registry.remove_later(target, group)
+        in_space_during_step.append(target.body in space.bodies)
+
+    registry.on(BALL, TARGET, begin=hit)
+    space.step(1 / 60)
+    assert in_space_during_step == [True]
+    assert target.body not in space.bodies and target.body_shape not in space.shapes
+    assert registry.entity(target.body_shape) is None and registry.entity(ball.body_shape) is ball
+    assert target not in group and not registry.pending
+    # The next step has nothing left to remove
+    space.step(1 / 60)
+
+
+def test_returning_false_ignores_the_collision():
+    space, registry, ball, target = overlapping_pair()
+    registry.on(BALL, TARGET, pre_solve=lambda a, b, arbiter: False)
+    # Overlapping shapes are pushed apart over the steps after they touch
+    space.step(1 / 60)
+    space.step(1 / 60)
+    assert ball.body.position == (0, 0) and target.body.position == (15, 0)
@@ -0,0 +1,34 @@
+import json
+from generator import GeneratedLevel, default_loadouts, generate_layout, validate
+from level_data import compile_level
+from simulation import build_level
+
+AIMS = [(600, 20), (750, 35), (450, 10), (900, 50), (300, 0), (1000, 20)]
+
+
+def test_layouts_are_seeded():
+    assert generate_layout(5) == generate_layout(5)
+    assert generate_layout(5) != generate_layout(6)
+
+
+def test_solutions_win_and_difficulty_is_the_share_of_sampled_aims_that_lose():
+    for seed in range(10):
+        seed, generated = validate((seed, AIMS, 4))
+        if generated is not None:
+            break
+    assert generated is not None
+    # Every load-out is scored on the same four aims
+    assert all(fraction * 4 == round(fraction * 4) for fraction in generated.win_fractions.values())
+    fractions = list(generated.win_fractions.values())
+    assert generated.difficulty == 1 - sum(fractions) / len(fractions)
+    data = compile_level(generated.data, f'seed {seed}', default_loadouts())
+    for class_choice, shots in generated.solutions.items():
+        assert build_level(0, class_choice, data).simulate(shots, max_time=30) == 1
+
+
+def test_saved_levels_are_valid_level_files(tmp_path):
+    level = GeneratedLevel(3, generate_layout(3), {1: 0.5, 2: 0.25}, {1: [(600, 20)], 2: [(750, 35)]})
+    with open(level.save(str(tmp_path))) as file:
+        data = json.load(file)
+    assert (data['seed'], data['difficulty'], data['solutions']) == (3, 0.625, {'1': [[600, 20]], '2': [[750, 35]]})
+    compile_level(data, 'generated_3.json', default_loadouts())
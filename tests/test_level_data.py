@@ -0,0 +1,92 @@
+import copy
+import json
+import pytest
+from level_data import LevelFormatError, LevelLibrary, compile_level, compile_loadouts, level_library
+
+LOADOUTS = {'1': [{'pos': [140, 510], 'radius': 10, 'mass': 2}]}
+LEVEL = {
+    'background': 'game_background_1',
+    'floor': {'start': [0, 720], 'end': [1280, 720]},
+    'blocks': [{'pos': [660, 520], 'size': [40, 400], 'body': 'dynamic', 'angle': 0.5}],
+    'enemies': [{'pos': [780, 686], 'size': [25, 25]}],
+    'next': None,
+}
+
+
+def level(**changes):
+    data = copy.deepcopy(LEVEL)
+    data.update(changes)
+    return data
+
+
+def test_compiles_into_tuples():
+    compiled = compile_level(level(), 'level.json', compile_loadouts(LOADOUTS, 'index.json'))
+    assert compiled['floor'] == ((0.0, 720.0), (1280.0, 720.0))
+    assert compiled['blocks'] == ((660.0, 520.0, 40.0, 400.0, 'dynamic', 0.5),)
+    assert compiled['enemies'] == ((780.0, 686.0, 25.0, 25.0),)
+    assert compiled['loadouts'] == {1: ((140.0, 510.0, 10.0, 2.0, 0.5, 0.5),)}
+    assert compiled['physics'] is None
+
+
+def test_generator_entries_are_allowed():
+    compile_level(level(seed=3, difficulty=0.5, solutions={'1': [[600, 20]]}), 'level.json', {})
+
+
+@pytest.mark.parametrize('data, message', [
+    (level(blcoks=[]), "'blcoks' is not a level entry"),
+    (level(enemies=[]), 'at least one enemy'),
+    (level(enemies=[[780, 686]]), 'enemy 0 must be an object'),
+    (level(blocks=['block']), 'block 0 must be an object'),
+    (level(blocks=[{'pos': [0, 0], 'size': [10, 10], 'body': 'floating'}]), 'body must be "static" or "dynamic"'),
+    (level(blocks=[{'pos': [0, 0], 'size': [10, -1], 'body': 'static'}]), 'size must be positive'),
+    (level(floor={'start': [0, 720]}), 'floor end must be a list of two numbers'),
+    (level(next=True), '"next" must be a level number or null'),
+    (level(physics={'iterations': 0}), 'must be a whole number of at least 1'),
+    (level(physics={'gravity': 981}), 'is not a physics setting'),
+    (level(loadouts={'1': ['ball']}), 'class 1 weapon 0 must be an object'),
+    (level(loadouts={'1': [{'pos': [0, 0], 'radius': 0, 'mass': 1}]}), 'radius must be positive'),
+    (level(loadouts={'first': LOADOUTS['1']}), "class 'first' must be a number"),
+])
+def test_rejects_invalid_levels(data, message):
+    with pytest.raises(LevelFormatError, match=message):
+        compile_level(data, 'level.json', {})
+
+
+def write_levels(directory, levels, local_levels=None):
+    names = []
+    for i, data in enumerate(levels, 1):
+        names.append(f'level{i}.json')
+        (directory / names[-1]).write_text(json.dumps(data))
+    (directory / 'index.json').write_text(json.dumps({'levels': names, 'loadouts': LOADOUTS}))
+    if local_levels is not None:
+        (directory / 'generated').mkdir()
+        (directory / 'generated' / 'index.json').write_text(json.dumps({'levels': local_levels}))
+
+
+def test_library_checks_next_levels_exist(tmp_path):
+    write_levels(tmp_path, [level(next=2)])
+    with pytest.raises(LevelFormatError, match='next level 2 does not exist'):
+        LevelLibrary(str(tmp_path)).load()
+
+
+def test_library_lists_local_levels_after_the_index(tmp_path):
+    write_levels(tmp_path, [level(next=2), level(enemies=[{'pos': [10, 10], 'size': [5, 5]}])], ['level2.json'])
+    library = LevelLibrary(str(tmp_path))
+    assert len(library) == 3
+    assert library.get(3)['enemies'] == ((10.0, 10.0, 5.0, 5.0),)
+    with pytest.raises(LevelFormatError, match='There is no level 4'):
+        library.get(4)
+
+
+def test_cache_is_used_until_a_level_file_changes(tmp_path):
+    write_levels(tmp_path, [level()])
+    cache_path = str(tmp_path / 'levels.cache')
+    assert LevelLibrary(str(tmp_path), cache_path).get(1)['enemies'] == ((780.0, 686.0, 25.0, 25.0),)
+    # Changing the file's size changes its signature even within the same clock tick
+    (tmp_path / 'level1.json').write_text(json.dumps(level(enemies=[{'pos': [1, 2], 'size': [3, 4]}])))
+    assert LevelLibrary(str(tmp_path), cache_path).get(1)['enemies'] == ((1.0, 2.0, 3.0, 4.0),)
+
+
+def test_shipped_levels_are_valid():
+    level_library.reload()
+    assert len(level_library) >= 2
@@ -0,0 +1,47 @@
+from levels import Level
+from pools import EntityPools, Pool
+from simulation import HeadlessGame, build_level
+
+SHOTS = [(600, 40), (100, 0), (600, 40)]
+CASES = [(1, 1), (2, 2), (1, 2), (2, 1)]
+
+
+def state(level):
+    return ([(tuple(body.position), body.angle, tuple(body.velocity)) for body in level.space.bodies],
+            level.status(), level.steps)
+
+
+def test_pooled_levels_play_out_like_fresh_ones():
+    fresh = {}
+    for level_pointer, class_choice in CASES:
+        level = build_level(level_pointer, class_choice)
+        level.simulate(SHOTS, max_time=8, settle_speed=5)
+        fresh[level_pointer, class_choice] = state(level)
+    game = HeadlessGame(1, 1)
+    pooled = Level(game, headless=True)
+    # Switching level or load-out every time builds each level from the sprites of the last
+    for level_pointer, class_choice in CASES + CASES[::-1]:
+        game.level_pointer, game.class_choice = level_pointer, class_choice
+        pooled.restart()
+        pooled.simulate(SHOTS, max_time=8, settle_speed=5)
+        assert state(pooled) == fresh[level_pointer, class_choice]
+    assert all(hits for hits, misses in pooled.pools.stats().values())
+
+
+def test_pool_reuses_the_oldest_sprite_and_counts():
+    pool = Pool(2)
+    assert pool.acquire() is None
+    for sprite in ('first', 'second', 'third'):
+        pool.release(sprite)
+    assert (pool.acquire(), pool.acquire(), pool.acquire()) == ('first', 'second', None)
+    assert (pool.hits, pool.misses) == (2, 2)
+
+
+def test_empty_pools_create_every_sprite():
+    game = HeadlessGame(1, 1)
+    game.pool_sizes = {name: 0 for name in EntityPools().pools}
+    level = Level(game, headless=True)
+    level.restart()
+    game.level_pointer = 2
+    level.restart()
+    assert not any(hits for hits, misses in level.pools.stats().values())
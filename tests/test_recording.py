@@ -0,0 +1,40 @@
+import pygame as pg
+import pytest
+from recording import Recording, RecordingError
+from replay import replay_headless
+
+
+def recording():
+    recorded = Recording(1, 2, 165, 500, 20)
+    for step in range(0, 1500, 3):
+        if step == 30:
+            recorded.add_key(pg.K_d, 500, 20)
+            recorded.add_key(pg.K_SPACE, 600, 40)
+        # A key the level ignores is not recorded
+        recorded.add_key(pg.K_q, 600, 40)
+        recorded.add_frame(3)
+    return recorded
+
+
+def test_recording_round_trip(tmp_path):
+    recorded = recording()
+    recorded.outcome = 2
+    loaded = Recording.load(recorded.save(directory=str(tmp_path)))
+    assert (loaded.level_pointer, loaded.class_choice, loaded.physics_rate, loaded.shot_power, loaded.shot_angle,
+            loaded.outcome, loaded.signature) == (1, 2, 165, 500, 20, 2, recorded.signature)
+    assert loaded.frames == recorded.frames and loaded.steps == recorded.steps == 1500
+    assert loaded.inputs == recorded.inputs == [(30, pg.K_d, 500, 20), (30, pg.K_SPACE, 600, 40)]
+
+
+def test_replays_are_identical():
+    first, second = replay_headless(recording()), replay_headless(recording())
+    assert first.steps == second.steps == 1500
+    assert (first.status, first.enemies_left, first.weapons_left) == (second.status, second.enemies_left,
+                                                                      second.weapons_left)
+    assert first.weapons_left < 3
+
+
+@pytest.mark.parametrize('data', [b'', b'PMRC', recording().to_bytes()[:-2]])
+def test_rejects_files_that_are_not_recordings(data):
+    with pytest.raises(RecordingError):
+        Recording.from_bytes(data)
@@ -0,0 +1,113 @@
+import pygame as pg
+import pymunk as pm
+import pytest
+from render import DirtyRectRenderer, PolygonBatch
+
+
+class Box:
+    def __init__(self, display, rect, colour='red'):
+        self.display = display
+        self.rect = pg.Rect(rect)
+        self.colour = colour
+        self.draws = 0
+
+    def draw(self):
+        self.draws += 1
+        return self.display.fill(self.colour, self.rect)
+
+    def component(self, key=None):
+        return self, key or self.colour, self.draw
+
+
+@pytest.fixture
+def scene(display):
+    renderer = DirtyRectRenderer(display)
+    renderer.set_background(pg.Surface(display.get_size()))
+    boxes = {name: Box(display, rect) for name, rect in
+             {'a': (0, 0, 50, 50), 'overlapping': (40, 40, 50, 50), 'apart': (500, 500, 20, 20)}.items()}
+    renderer.render([box.component() for box in boxes.values()])
+    for box in boxes.values():
+        box.draws = 0
+    return renderer, boxes
+
+
+def test_first_frame_is_drawn_in_full(display):
+    renderer = DirtyRectRenderer(display)
+    renderer.set_background(pg.Surface(display.get_size()))
+    box = Box(display, (0, 0, 10, 10))
+    assert renderer.render([box.component()]) == [display.get_rect()]
+    assert box.draws == 1
+
+
+def test_nothing_is_drawn_while_nothing_changes(scene):
+    renderer, boxes = scene
+    assert renderer.render([box.component() for box in boxes.values()]) == []
+    assert not any(box.draws for box in boxes.values())
+
+
+def test_changed_components_and_those_they_overlap_are_redrawn(scene, display):
+    renderer, boxes = scene
+    boxes['a'].colour = 'blue'
+    dirty = renderer.render([box.component() for box in boxes.values()])
+    assert (boxes['a'].draws, boxes['overlapping'].draws, boxes['apart'].draws) == (1, 1, 0)
+    assert pg.Rect(0, 0, 50, 50) in dirty and pg.Rect(40, 40, 50, 50) in dirty
+    assert display.get_at((45, 45)) == pg.Color('red') and display.get_at((10, 10)) == pg.Color('blue')
+
+
+def test_removed_components_are_cleared(scene, display):
+    renderer, boxes = scene
+    dirty = renderer.render([boxes['a'].component(), boxes['overlapping'].component()])
+    assert dirty == [pg.Rect(500, 500, 20, 20)]
+    assert display.get_at((510, 510)) == pg.Color('black')
+
+
+def test_a_new_background_or_refresh_draws_everything(scene, display):
+    renderer, boxes = scene
+    renderer.set_background(renderer.background)
+    assert renderer.render([box.component() for box in boxes.values()]) == []
+    for refresh in (lambda: renderer.set_background(pg.Surface(display.get_size())), renderer.refresh):
+        refresh()
+        assert renderer.render([box.component() for box in boxes.values()]) == [display.get_rect()]
+    assert all(box.draws == 2 for box in boxes.values())
+
+
+def test_disabled_renderer_draws_every_frame(display):
+    renderer = DirtyRectRenderer(display, enabled=False)
+    renderer.set_background(pg.Surface(display.get_size()))
+    box = Box(display, (0, 0, 10, 10))
+    for _ in range(3):
+        assert renderer.render([box.component()]) == [display.get_rect()]
+    assert box.draws == 3
+
+
+class Polygon:
+    def __init__(self, space, position, angle):
+        self.body = pm.Body(1, 100)
+        self.body.position = position
+        self.body.angle = angle
+        self.body_shape = pm.Poly.create_box(self.body, (20, 20))
+        self.corners = self.body_shape.get_vertices()
+        space.add(self.body, self.body_shape)
+
+
+def test_batch_poses_follow_the_bodies():
+    space = pm.Space()
+    space.gravity = (0, 981)
+    space.sleep_time_threshold = 0.1
+    resting = Polygon(space, (0, 0), 0)
+    space.add(pm.Segment(space.static_body, (-100, 10), (100, 10), 1))
+    polygons = [Polygon(space, (200 + i * 30, 100), i / 10) for i in range(20)] + [resting]
+    batch = PolygonBatch()
+    batch.add(*polygons)
+    for _ in range(120):
+        space.step(1 / 60)
+    # A sleeping body is listed apart from the awake ones and a removed one is not listed at all
+    assert resting.body.is_sleeping
+    space.remove(polygons[3].body, polygons[3].body_shape)
+    expected = [[*polygon.body.position, polygon.body.angle] for polygon in polygons]
+    assert batch.poses().tolist() == expected
+    points = batch.transform()
+    index, corners = batch.slices[polygons[5]]
+    assert points[corners].tolist() == [[round(x), round(y)] for x, y in
+                                        (corner.rotated(polygons[5].body.angle) + polygons[5].body.position
+                                         for corner in polygons[5].corners)]
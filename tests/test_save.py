@@ -0,0 +1,61 @@
+import pytest
+from levels import Level
+from save import Checkpoint, SaveError, SaveGame, SaveWriter
+from simulation import HeadlessGame
+
+
+def bodies(level):
+    return [(tuple(body.position), body.angle, tuple(body.velocity)) for body in level.snapshot.bodies
+            if body.space is not None]
+
+
+def attempt_in_progress():
+    level = Level(HeadlessGame(1, 2), headless=True)
+    level.restart()
+    level.shot_power, level.shot_angle = 650, 25
+    level.simulate([(700, 30)], max_time=1.5)
+    assert level.status() == 3 and level.steps > 0
+    return level
+
+
+def test_save_round_trip():
+    save = SaveGame([1, 2], 0.42, 2)
+    loaded = SaveGame.from_bytes(save.to_bytes())
+    assert (loaded.levels_completed, loaded.volume, loaded.class_choice, loaded.checkpoint) == ([1, 2], 0.42, 2, None)
+
+
+def test_checkpoint_round_trip_resumes_the_attempt():
+    level = attempt_in_progress()
+    checkpoint = Checkpoint.from_level(level)
+    loaded = SaveGame.from_bytes(SaveGame([1], 1, 2, checkpoint).to_bytes()).checkpoint
+    assert (loaded.bodies, loaded.weapons, loaded.enemies) == (checkpoint.bodies, checkpoint.weapons,
+                                                               checkpoint.enemies)
+
+    resumed = Level(HeadlessGame(1, 2), headless=True)
+    resumed.restart()
+    assert loaded.apply(resumed)
+    assert bodies(resumed) == bodies(level)
+    assert (resumed.steps, resumed.shot_power, resumed.shot_angle) == (level.steps, 650, 25)
+    assert len(resumed.weapons) == len(level.weapons) and len(resumed.enemies) == len(level.enemies)
+
+
+def test_no_checkpoint_before_the_first_step():
+    level = Level(HeadlessGame(1, 1), headless=True)
+    level.restart()
+    assert Checkpoint.from_level(level) is None
+
+
+@pytest.mark.parametrize('data', [b'', b'garbage', SaveGame([1], 1, 1).to_bytes()[:-4]])
+def test_rejects_files_that_are_not_saves(data):
+    with pytest.raises(SaveError):
+        SaveGame.from_bytes(data)
+
+
+def test_writer_saves_in_the_background(tmp_path):
+    path = str(tmp_path / 'saves' / 'save.pms')
+    writer = SaveWriter(path)
+    writer.write(SaveGame([1], 0.5, 1))
+    writer.write(SaveGame([1, 2], 0.25, 2))
+    writer.close()
+    loaded = SaveGame.load(path)
+    assert (loaded.levels_completed, loaded.volume, loaded.class_choice) == ([1, 2], 0.25, 2)
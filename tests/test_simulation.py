@@ -0,0 +1,31 @@
+from simulation import SETTLE_SPEED, build_level, simulate
+
+
+def test_a_winning_shot_wins():
+    result = simulate(1, 1, [(550, 25)], settle_speed=None)
+    assert (result.won, result.status, result.enemies_left) == (True, 1, 0)
+
+
+def test_a_missed_shot_leaves_the_enemies():
+    result = simulate(1, 1, [(0, 0)])
+    assert not result.won and result.enemies_left == 2 and result.weapons_left == 2
+
+
+def test_simulations_are_deterministic():
+    shots = [(900, 45), (300, 10), (700, 5)]
+    first, second = simulate(2, 2, shots), simulate(2, 2, shots)
+    assert (first.status, first.steps, first.enemies_left) == (second.status, second.steps, second.enemies_left)
+
+
+def test_settling_only_cuts_the_wait_short():
+    level = build_level(1, 1)
+    assert level.simulate([(550, 25)], settle_speed=SETTLE_SPEED) == 1
+    settled_steps = level.steps
+    level = build_level(1, 1)
+    assert level.simulate([(550, 25)]) == 1
+    assert settled_steps <= level.steps
+
+
+def test_headless_level_has_no_display():
+    level = build_level(1, 2)
+    assert level.game.display is None and len(level.weapons) == 3 and len(level.enemies) == 2
@@ -0,0 +1,35 @@
+import pytest
+from levels import Level
+from simulation import HeadlessGame, build_level
+
+SHOTS = [[(500, 20)], [(900, 45), (300, 10)], [(0, 0)]]
+
+
+def state(level):
+    return ([(tuple(body.position), body.angle, tuple(body.velocity)) for body in level.space.bodies],
+            level.status(), level.steps, len(level.weapons), len(level.enemies))
+
+
+@pytest.mark.parametrize('level_pointer', [1, 2])
+def test_restart_plays_out_like_a_fresh_level(level_pointer):
+    level = Level(HeadlessGame(level_pointer, 1), headless=True)
+    level.restart()
+    snapshot = level.snapshot
+    for shots in SHOTS:
+        level.restart()
+        level.simulate(shots, max_time=10, settle_speed=5)
+        fresh = build_level(level_pointer, 1)
+        fresh.simulate(shots, max_time=10, settle_speed=5)
+        assert state(level) == state(fresh)
+    # Every restart restored the snapshot instead of loading the level again
+    assert level.snapshot is snapshot
+
+
+def test_snapshot_is_retaken_for_another_load_out():
+    game = HeadlessGame(1, 1)
+    level = Level(game, headless=True)
+    level.restart()
+    snapshot = level.snapshot
+    game.class_choice = 2
+    level.restart()
+    assert level.snapshot is not snapshot and level.snapshot.class_choice == 2
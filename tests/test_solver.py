@@ -0,0 +1,16 @@
+from solver import ShotSolver, finer
+from simulation import simulate
+
+
+def test_finer_halves_the_step_down_to_the_smallest():
+    assert [finer(step, 10) for step in (100, 50, 20, 10)] == [50, 20, 10, 10]
+    assert finer(45, 1) == 22
+
+
+def test_every_solution_wins_when_played_in_full():
+    with ShotSolver(1, processes=1, power_step=500, angle_step=45, refine_count=1) as solver:
+        winners = solver.solve_loadout(1)
+    assert winners and winners == sorted(winners)
+    assert len({len(shots) for shots in winners}) == 1
+    for shots in winners[:3]:
+        assert simulate(1, 1, shots, settle_speed=None).won